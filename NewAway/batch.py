@@ -0,0 +1,271 @@
+"""Solve several departments together against shared teacher availability.
+
+Usage:
+    python NewAway/batch.py cse/ eee/ math/ --out-dir routines
+    python NewAway/batch.py cse/ eee/ --availability availability.json --method greedy
+
+Each department folder holds the usual ``courses.txt``, ``priority.txt``,
+``teachers.txt`` and optional ``rooms.txt``. Teachers are matched by name
+across departments: once a department is solved, the slots its teachers use
+are blocked for every later department (in command-line order), so nobody is
+double-booked. Departments that share no teacher, directly or through
+others, form independent groups that are solved in parallel processes.
+
+``--availability`` names a JSON store of teacher slots booked per department.
+Bookings of departments outside this batch (e.g. another faculty's run) are
+blocked; the departments being solved replace their own earlier bookings, so
+re-running a batch does not collide with itself.
+
+Each department gets its own folder of PDFs under ``--out-dir``, plus one
+cross-department PDF per teacher and a ``summary.json``.
+``--export json,csv,ics`` also writes the machine-readable exports (see
+``export``) into each department folder. All departments share one time
+grid (``--grid``), since teacher bookings are compared slot by slot.
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import export
+import scheduler
+import scoring
+import storage
+import timegrid
+from occupancy import mask_slots, window_mask
+from resources import load_rooms
+
+
+def load_department(folder, name=None):
+    return {
+        "name": name or os.path.basename(os.path.normpath(folder)),
+        "teachers": scheduler.load_teachers(os.path.join(folder, "teachers.txt")),
+        "teacher_priorities": scheduler.load_teacher_priorities(os.path.join(folder, "priority.txt")),
+        "courses": scheduler.load_courses(os.path.join(folder, "courses.txt")),
+        "rooms": load_rooms(os.path.join(folder, "rooms.txt")),
+    }
+
+
+def load_availability(path):
+    """Read ``{department: {teacher: {day: [slots]}}}``; missing file -> {}"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r") as file:
+        store = json.load(file)
+    error = ValueError("expected {department: {teacher: {day: [slots]}}}")
+    if not isinstance(store, dict):
+        raise error
+    for teachers in store.values():
+        if not isinstance(teachers, dict):
+            raise error
+        for days in teachers.values():
+            if not isinstance(days, dict):
+                raise error
+            for slots in days.values():
+                if not isinstance(slots, list) or not all(isinstance(s, int) for s in slots):
+                    raise error
+    return store
+
+
+def busy_masks(store, exclude=()):
+    """Merge the store into ``{(teacher, day): mask}``, skipping ``exclude`` departments"""
+    busy = {}
+    for department, teachers in store.items():
+        if department in exclude:
+            continue
+        for teacher, days in teachers.items():
+            for day, slots in days.items():
+                busy[(teacher, day)] = busy.get((teacher, day), 0) | window_mask(slots)
+    return busy
+
+
+def save_availability(path, store, solved, departments):
+    """Replace the solved departments' bookings in ``store`` and write it atomically"""
+    store = dict(store)
+    for department in departments:
+        routine, _ = solved[department["name"]]
+        booked = {}
+        for (teacher, day), mask in sorted(scoring.teacher_day_masks(routine, department["courses"]).items()):
+            booked.setdefault(teacher, {})[day] = mask_slots(mask)
+        store[department["name"]] = booked
+    storage.atomic_write(path, [json.dumps(store, indent=2), "\n"])
+
+
+def independent_groups(departments):
+    """Split departments into groups that share no teacher; order is kept"""
+    parent = list(range(len(departments)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner = {}
+    for i, department in enumerate(departments):
+        for course in department["courses"]:
+            j = owner.setdefault(course["teacher"], i)
+            parent[find(i)] = find(j)
+    groups = {}
+    for i in range(len(departments)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values())
+
+
+def _solve_group(job):
+    """Solve one group's departments in order, each around the slots taken so far"""
+    departments, busy, method, node_limit, time_limit, grid = job
+    busy = dict(busy)
+    results = []
+    for department in departments:
+        courses = department["courses"]
+        teachers = {c["teacher"] for c in courses}
+        relevant = {key: mask for key, mask in busy.items() if key[0] in teachers}
+        if method == "search":
+            import search
+            routine, diagnostics = search.solve(courses, department["teacher_priorities"],
+                                                department["teachers"], node_limit, time_limit,
+                                                rooms=department["rooms"], busy=relevant, grid=grid)
+        else:
+            routine, diagnostics = scheduler.solve(courses, department["teacher_priorities"],
+                                                   department["teachers"], rooms=department["rooms"],
+                                                   busy=relevant, grid=grid)
+        for key, mask in scoring.teacher_day_masks(routine, courses).items():
+            busy[key] = busy.get(key, 0) | mask
+        results.append((department["name"], routine, diagnostics))
+    return results, busy
+
+
+def solve_batch(departments, busy=None, method="search", node_limit=200000, time_limit=10.0,
+                workers=None, grid=None):
+    """Return ``({name: (routine, diagnostics)}, busy)`` where ``busy`` is the
+    shared availability after every department was booked"""
+    busy = dict(busy or {})
+    groups = independent_groups(departments)
+    jobs = [([departments[i] for i in group], busy, method, node_limit, time_limit, grid)
+            for group in groups]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        outcomes = [_solve_group(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            outcomes = list(pool.map(_solve_group, jobs))
+
+    solved = {}
+    for results, group_busy in outcomes:
+        # Groups share no teachers, so their bookings never overlap
+        busy.update(group_busy)
+        for name, routine, diagnostics in results:
+            solved[name] = (routine, diagnostics)
+    return {d["name"]: solved[d["name"]] for d in departments}, busy
+
+
+def teacher_cells(departments, solved):
+    """``{teacher: {(day, slot): text}}`` across every department"""
+    cells = {}
+    for department in departments:
+        routine, _ = solved[department["name"]]
+        teacher_of = {c["code"]: c["teacher"] for c in department["courses"]}
+        for group, days in routine.items():
+            for day, slots in days.items():
+                for slot, data in slots.items():
+                    if data and data[0] in teacher_of:
+                        cells.setdefault(teacher_of[data[0]], {})[(day, slot)] = (
+                            f"{data[0]}\n({department['name']}, {scheduler.group_name(group)})")
+    return cells
+
+
+def write_outputs(departments, solved, out_dir, pdf=True, grid=None, formats=(), term_start=None, weeks=14):
+    if pdf:
+        import render  # ReportLab is only needed for PDFs
+    os.makedirs(out_dir, exist_ok=True)
+    summary = {}
+    for department in departments:
+        name = department["name"]
+        routine, diagnostics = solved[name]
+        folder = os.path.join(out_dir, scheduler.safe_name(name))
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "routine.txt"), "w") as file:
+            file.write(scheduler.generate_schedule_text(routine))
+        if formats:
+            export.export_all(routine, department["courses"], folder, formats, grid, term_start, weeks)
+        if pdf:
+            teacher_short_names = scheduler.generate_teacher_short_names(
+                department["teachers"] + [c["teacher"] for c in department["courses"]])
+            render.render_all(routine, department["courses"], teacher_short_names, folder, grid=grid)
+        summary[name] = {"courses": len(department["courses"]),
+                         "missing_sessions": scheduler.missing_sessions(diagnostics),
+                         "unplaced": diagnostics["unplaced"], "warnings": diagnostics["warnings"]}
+    if pdf:
+        teachers_dir = os.path.join(out_dir, "teachers")
+        os.makedirs(teachers_dir, exist_ok=True)
+        for teacher, cells in teacher_cells(departments, solved).items():
+            path = os.path.join(teachers_dir, f"teacher_{scheduler.safe_name(teacher)}.pdf")
+            render.build_pdf(path, render.grid_story(teacher, cells, grid))
+    with open(os.path.join(out_dir, "summary.json"), "w") as file:
+        json.dump(summary, file, indent=2)
+    return summary
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Solve several departments with shared teachers.")
+    parser.add_argument("departments", nargs="+", help="department folders, highest priority first")
+    parser.add_argument("--out-dir", default="routines")
+    parser.add_argument("--availability", help="JSON store of teacher slots already taken; updated in place")
+    parser.add_argument("--grid", help="time grid JSON shared by every department (default: the standard week)")
+    parser.add_argument("--method", choices=["greedy", "search"], default="search")
+    parser.add_argument("--node-limit", type=int, default=200000)
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, help="parallel processes for independent departments")
+    parser.add_argument("--no-pdf", action="store_true", help="write text and summary only")
+    parser.add_argument("--export", type=export.parse_formats, default="", metavar="FORMATS",
+                        help="comma-separated export formats (json, csv, ics) per department")
+    parser.add_argument("--term-start", type=datetime.date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="first week of the exported calendars (default: today)")
+    parser.add_argument("--weeks", type=export.positive_int, default=14,
+                        help="weeks each calendar event repeats")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    departments = [load_department(folder) for folder in args.departments]
+    names = [d["name"] for d in departments]
+    if len(set(names)) != len(names):
+        print("Error: department folders must have distinct names.", file=sys.stderr)
+        return 1
+
+    try:
+        grid = timegrid.load_grid(args.grid)
+    except (ValueError, TypeError) as e:
+        print(f"Error: {args.grid}: {e}", file=sys.stderr)
+        return 1
+    try:
+        store = load_availability(args.availability)
+    except (OSError, ValueError) as e:
+        print(f"Error: {args.availability}: {e}", file=sys.stderr)
+        return 1
+    solved, _ = solve_batch(departments, busy_masks(store, exclude=names), args.method,
+                            args.node_limit, args.time_limit, args.workers, grid)
+    try:
+        summary = write_outputs(departments, solved, args.out_dir, not args.no_pdf, grid, args.export,
+                                args.term_start, args.weeks)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.availability:
+        save_availability(args.availability, store, solved, departments)
+
+    groups = independent_groups(departments)
+    print(f"Solved {len(departments)} departments in {len(groups)} independent group(s); "
+          f"outputs in '{args.out_dir}'.")
+    for name, info in summary.items():
+        if info["missing_sessions"]:
+            print(f"Warning: {name}: {info['missing_sessions']} sessions unplaced", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
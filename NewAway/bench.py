@@ -0,0 +1,205 @@
+"""Benchmark harness: synthetic timetables at configurable size and per-phase timings.
+
+Usage:
+    python NewAway/bench.py --sizes 50,200,1000 --out bench_report.json
+    python NewAway/bench.py --sizes 100 --lab-ratio 0.5 --pref-density 0.8 --memory --pdf
+    python NewAway/bench.py --sizes 1000 --grid half_hour_grid.json
+
+Each size is a course count; teachers and years scale with it unless given.
+The report is JSON with one entry per (size, repeat) holding the wall time of
+every phase (load, even pass, odd pass, text build, optionally search and
+PDF build), the placement rate and, with --memory, peak traced memory.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import scheduler
+import timegrid
+from occupancy import Occupancy
+from resources import ResourceIndex
+
+
+def generate_instance(n_courses, n_teachers=None, n_years=None, lab_ratio=0.35,
+                      pref_density=0.5, seed=0, grid=None):
+    """Return ``(teachers, teacher_priorities, courses)`` for a random department.
+
+    ``pref_density`` is the fraction of days on which each teacher states a
+    preferred span (1-4 slots long).
+    """
+    grid = grid or timegrid.DEFAULT
+    rng = random.Random(seed)
+    n_teachers = n_teachers or max(1, math.ceil(n_courses / 4))
+    n_years = n_years or max(1, math.ceil(n_courses / 8))
+    teachers = [f"Teacher {i:04d} T{i}" for i in range(n_teachers)]
+
+    teacher_priorities = {}
+    for rank, teacher in enumerate(teachers):
+        days = rng.sample(grid.days, round(pref_density * len(grid.days)))
+        slots = []
+        for day in days:
+            first = rng.randrange(len(grid.slots))
+            last = min(len(grid.slots) - 1, first + rng.randrange(4))
+            start = grid.times[grid.slots[first]][0]
+            end = grid.times[grid.slots[last]][1]
+            slots.append(f"{day} {timegrid.format_clock(start)}-{timegrid.format_clock(end)}")
+        teacher_priorities[teacher] = {"priority": rank + 1, "slots": slots}
+
+    courses = []
+    for i in range(n_courses):
+        year = i % n_years + 1
+        lab = rng.random() < lab_ratio
+        number = year * 10000 + 2 * i + (0 if lab else 1)
+        courses.append({
+            "code": f"CSE {number}",
+            "name": f"Course {i}",
+            "year": year,
+            "credit": rng.choice([1.0, 1.5]) if lab else rng.choice([2.0, 3.0]),
+            "teacher": rng.choice(teachers),
+        })
+    return teachers, teacher_priorities, courses
+
+
+def write_instance(directory, teachers, teacher_priorities, courses):
+    paths = {
+        "teachers": os.path.join(directory, "teachers.txt"),
+        "priorities": os.path.join(directory, "priority.txt"),
+        "courses": os.path.join(directory, "courses.txt"),
+    }
+    scheduler.save_teachers(paths["teachers"], teachers)
+    scheduler.save_teacher_priorities(paths["priorities"], teacher_priorities)
+    scheduler.save_courses(paths["courses"], courses)
+    return paths
+
+
+class PhaseTimer:
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.phases = {}
+        self.peak_memory_kb = {}
+
+    def run(self, name, func, *args, **kwargs):
+        if self.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.phases[name] = time.perf_counter() - start
+        if self.memory:
+            self.peak_memory_kb[name] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+        return result
+
+
+def placement_rate(courses, diagnostics):
+    required = sum(scheduler.required_sessions(c) for c in courses)
+    return 1.0 - scheduler.missing_sessions(diagnostics) / required if required else 1.0
+
+
+def run_case(paths, memory=False, pdf=False, search=False, search_time=10.0, grid=None):
+    timer = PhaseTimer(memory)
+
+    def load():
+        teachers = scheduler.load_teachers(paths["teachers"])
+        teacher_priorities = scheduler.load_teacher_priorities(paths["priorities"])
+        courses = scheduler.load_courses(paths["courses"])
+        pref_index, _ = scheduler.compile_preferences(teacher_priorities, grid)
+        return teachers, teacher_priorities, courses, pref_index
+
+    teachers, teacher_priorities, courses, pref_index = timer.run("load", load)
+
+    # The greedy pipeline of scheduler.solve, split so each pass is timed on its own
+    rank = scheduler.teacher_rank(teacher_priorities)
+    ordered = sorted(courses, key=lambda c: rank.get(c["teacher"], float("inf")))
+    index = ResourceIndex(courses)
+    routine = scheduler.empty_routine(index, grid)
+    occupancy = Occupancy(index)
+    short_names = scheduler.generate_teacher_short_names(teachers)
+    diagnostics = {"unplaced": [], "warnings": []}
+    timer.run("even_pass", scheduler.process_even_courses, ordered, pref_index, routine,
+              occupancy, short_names, diagnostics, grid)
+    timer.run("odd_pass", scheduler.process_odd_courses, ordered, pref_index, routine,
+              occupancy, short_names, diagnostics, grid)
+    timer.run("text_build", scheduler.generate_schedule_text, routine)
+
+    result = {"placement_rate": placement_rate(courses, diagnostics)}
+    if search:
+        import search as search_module
+        _, search_diagnostics = timer.run("search", search_module.solve, courses, teacher_priorities,
+                                          teachers, 0, search_time, pref_index, grid=grid)
+        result["search_placement_rate"] = placement_rate(courses, search_diagnostics)
+        result["search_status"] = search_diagnostics.get("search", {}).get("status")
+    if pdf:
+        import render
+        with tempfile.TemporaryDirectory() as out:
+            timer.run("pdf_build", render.create_pdf, routine, short_names,
+                      os.path.join(out, "routine.pdf"), grid=grid)
+
+    result["phases"] = timer.phases
+    result["total_seconds"] = sum(timer.phases.values())
+    if memory:
+        result["peak_memory_kb"] = timer.peak_memory_kb
+    return result
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler on synthetic timetables.")
+    parser.add_argument("--sizes", default="50,200,1000", help="comma-separated course counts")
+    parser.add_argument("--teachers", type=int, help="teacher count (default: courses / 4)")
+    parser.add_argument("--years", type=int, help="year count (default: courses / 8)")
+    parser.add_argument("--lab-ratio", type=float, default=0.35)
+    parser.add_argument("--pref-density", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="record peak memory per phase (slower)")
+    parser.add_argument("--pdf", action="store_true", help="also time the PDF build")
+    parser.add_argument("--search", action="store_true", help="also time the search solver")
+    parser.add_argument("--search-time", type=float, default=10.0)
+    parser.add_argument("--grid", help="time grid JSON (default: the standard week)")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        grid = timegrid.load_grid(args.grid)
+    except (ValueError, TypeError) as e:
+        print(f"Error: {args.grid}: {e}", file=sys.stderr)
+        return 1
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "runs": [],
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        for repeat in range(args.repeat):
+            seed = args.seed + repeat
+            teachers, teacher_priorities, courses = generate_instance(
+                size, args.teachers, args.years, args.lab_ratio, args.pref_density, seed, grid)
+            with tempfile.TemporaryDirectory() as directory:
+                paths = write_instance(directory, teachers, teacher_priorities, courses)
+                result = run_case(paths, args.memory, args.pdf, args.search, args.search_time, grid)
+            result.update({"courses": size, "teachers": len(teachers),
+                           "years": len({c["year"] for c in courses}), "seed": seed})
+            report["runs"].append(result)
+            print(f"{size} courses (seed {seed}): {result['total_seconds']:.3f}s, "
+                  f"placed {result['placement_rate']:.1%}", file=sys.stderr)
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
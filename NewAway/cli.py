@@ -0,0 +1,147 @@
+"""Headless entry point: solve the routine without importing tkinter.
+
+Usage (from the folder holding the data files):
+    python NewAway/cli.py                      # solve and write routine_final.pdf
+    python NewAway/cli.py --no-pdf --text      # solve and print the schedule
+    python NewAway/cli.py --no-pdf --export-dir export   # JSON, CSV and .ics files
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+import export
+import instrument
+import scheduler
+import timegrid
+from resources import load_rooms
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate the course routine without the GUI.")
+    parser.add_argument("--courses", default="courses.txt")
+    parser.add_argument("--priorities", default="priority.txt")
+    parser.add_argument("--teachers", default="teachers.txt")
+    parser.add_argument("--rooms", default="rooms.txt", help="room list; rooms are ignored if it is missing")
+    parser.add_argument("--grid", default="grid.json", help="time grid; the standard week if it is missing")
+    parser.add_argument("--pdf", default="routine_final.pdf", help="output PDF path")
+    parser.add_argument("--out-dir", help="also write one PDF per teacher and per year into this folder")
+    parser.add_argument("--no-pdf", action="store_true", help="skip PDF rendering")
+    parser.add_argument("--text", action="store_true", help="print the schedule text")
+    parser.add_argument("--export-dir", help="write routine.json, routine.csv and per-teacher / per-year "
+                                             ".ics calendars into this folder")
+    parser.add_argument("--formats", type=export.parse_formats, default="json,csv,ics",
+                        help="comma-separated export formats")
+    parser.add_argument("--term-start", type=datetime.date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="first week of the calendars (default: today)")
+    parser.add_argument("--weeks", type=export.positive_int, default=14,
+                        help="weeks each calendar event repeats")
+    parser.add_argument("--method", choices=["greedy", "search", "multistart"], default="search",
+                        help="greedy first-fit, backtracking search (default) or parallel multi-start greedy")
+    parser.add_argument("--node-limit", type=int, default=200000, help="search node budget (0 = unlimited)")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="search time budget in seconds (0 = unlimited)")
+    parser.add_argument("--starts", type=int, default=8, help="number of multi-start orderings")
+    parser.add_argument("--seed", type=int, help="multi-start / optimizer seed, for reproducible runs")
+    parser.add_argument("--workers", type=int, help="multi-start worker processes (default: all cores)")
+    parser.add_argument("--optimize", type=float, default=0, metavar="SECONDS",
+                        help="run the simulated-annealing post-pass for this long")
+    parser.add_argument("--diagnostics", help="write diagnostics as JSON to this path ('-' for stdout)")
+    parser.add_argument("--profile", help="write phase timings, fit counts and placement failures "
+                                          "as JSON to this path ('-' for stdout)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    profile = instrument.Profile() if args.profile else None
+
+    with instrument.phase(profile, "load"):
+        teachers = scheduler.load_teachers(args.teachers)
+        teacher_priorities = scheduler.load_teacher_priorities(args.priorities)
+        courses = scheduler.load_courses(args.courses)
+        rooms = load_rooms(args.rooms)
+        try:
+            grid = timegrid.load_grid(args.grid)
+        except (ValueError, TypeError) as e:
+            print(f"Error: {args.grid}: {e}", file=sys.stderr)
+            return 1
+    if not courses:
+        print("Error: No courses available to generate schedule.", file=sys.stderr)
+        return 1
+
+    # Compile preferences once and report malformed entries before solving
+    pref_index, errors = scheduler.compile_preferences(teacher_priorities, grid)
+    for error in errors:
+        print(f"Warning: invalid preference {error}", file=sys.stderr)
+
+    if args.method == "search":
+        import search
+        routine, diagnostics = search.solve(courses, teacher_priorities, teachers,
+                                            args.node_limit, args.time_limit, pref_index, rooms,
+                                            profile, grid=grid)
+    elif args.method == "multistart":
+        import multistart
+        with instrument.phase(profile, "multistart"):
+            routine, diagnostics = multistart.solve(courses, teacher_priorities, teachers, args.starts,
+                                                    args.seed, args.workers, pref_index, rooms, grid)
+    else:
+        routine, diagnostics = scheduler.solve(courses, teacher_priorities, teachers, pref_index,
+                                               rooms=rooms, profile=profile, grid=grid)
+
+    # The solvers only report preference errors they compiled themselves
+    diagnostics["warnings"] = errors + diagnostics["warnings"]
+
+    if args.optimize > 0:
+        import optimize
+        warnings = diagnostics["warnings"]
+        with instrument.phase(profile, "optimize"):
+            routine, diagnostics = optimize.optimize(routine, courses, teacher_priorities, teachers,
+                                                     args.optimize, args.seed, pref_index, rooms=rooms,
+                                                     grid=grid)
+        diagnostics["warnings"] = warnings + diagnostics["warnings"]
+
+    if args.text:
+        with instrument.phase(profile, "text_build"):
+            text = scheduler.generate_schedule_text(routine)
+        print(text)
+    if args.export_dir:
+        with instrument.phase(profile, "export"):
+            try:
+                written = export.export_all(routine, courses, args.export_dir, args.formats, grid,
+                                            args.term_start, args.weeks)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+        print(f"Wrote {len(written)} export files to '{args.export_dir}'.")
+    if not args.no_pdf:
+        # Imported lazily so batch runs that only need the routine skip ReportLab
+        import render
+        teacher_short_names = scheduler.generate_teacher_short_names(teachers)
+        with instrument.phase(profile, "pdf_build"):
+            if args.out_dir:
+                written = render.render_all(routine, courses, teacher_short_names, args.out_dir,
+                                            os.path.basename(args.pdf), grid=grid)
+            else:
+                render.create_pdf(routine, teacher_short_names, args.pdf, grid=grid)
+        if args.out_dir:
+            print(f"Wrote {len(written)} PDFs to '{args.out_dir}'.")
+        else:
+            print(f"Routine saved as '{args.pdf}'.")
+
+    if args.diagnostics == "-":
+        print(json.dumps(diagnostics, indent=2))
+    elif args.diagnostics:
+        with open(args.diagnostics, "w") as file:
+            json.dump(diagnostics, file, indent=2)
+    if profile is not None:
+        profile.export_json(args.profile, courses)
+
+    for item in diagnostics["unplaced"]:
+        print(f"Warning: Only assigned {item['assigned']}/{item['required']} slots for {item['code']}",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Machine-readable exports of a solved routine: JSON, CSV and iCalendar.
+
+Usage:
+    python NewAway/cli.py --no-pdf --export-dir export
+    python NewAway/cli.py --export-dir export --formats ics --term-start 2026-01-04 --weeks 14
+
+``routine_sessions`` walks the routine once and merges each run of one cell
+into a session (a lab is one session, not three slots), bucketing sessions
+by teacher and by group on the way. Every writer reads that one list:
+``routine.json`` and ``routine.csv`` hold all sessions, ``teacher_<name>.ics``
+and ``year_<group>.ics`` one weekly recurring event per session. A section's
+calendar also carries its year's year-wide sessions, since its students
+attend both. Nothing here needs ReportLab or tkinter.
+"""
+import argparse
+import calendar
+import csv
+import datetime
+import json
+import os
+
+import scheduler
+import timegrid
+
+FORMATS = ("json", "csv", "ics")
+CSV_FIELDS = ["code", "name", "year", "section", "group", "teacher", "day", "start", "end", "slots", "room"]
+
+
+def parse_formats(text):
+    """argparse type for a comma-separated format list; rejects unknown formats
+    before anything is solved"""
+    formats = [f.strip() for f in text.split(",") if f.strip()]
+    unknown = sorted(set(formats) - set(FORMATS))
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown export format: {', '.join(unknown)} "
+                                         f"(choose from {', '.join(FORMATS)})")
+    return formats
+
+
+def positive_int(text):
+    """argparse type for --weeks: an RRULE COUNT must be at least 1"""
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"expected a whole number of at least 1, got '{text}'")
+    return value
+
+
+def _clock(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def routine_sessions(routine, courses, grid=None):
+    """Return ``(sessions, by_teacher, by_group)`` from one pass over ``routine``.
+
+    Each session is a dict with the ``CSV_FIELDS`` keys (``slots`` a list);
+    ``start`` / ``end`` are 24h 'HH:MM' times from ``grid``.
+    """
+    grid = grid or timegrid.DEFAULT
+    by_code = {c["code"]: c for c in courses}
+    sessions, by_teacher, by_group = [], {}, {}
+
+    def add(group, day, cell, run):
+        course = by_code.get(cell[0], {})
+        session = {
+            "code": cell[0],
+            "name": course.get("name", ""),
+            "year": group[0] if isinstance(group, tuple) else group,
+            "section": group[1] if isinstance(group, tuple) else "",
+            "group": scheduler.group_name(group),
+            "teacher": course.get("teacher", cell[1]),
+            "day": day,
+            "start": _clock(grid.times[run[0]][0]),
+            "end": _clock(grid.times[run[-1]][1]),
+            "slots": run,
+            "room": cell[2] if len(cell) > 2 else "",
+        }
+        sessions.append(session)
+        by_teacher.setdefault(session["teacher"], []).append(session)
+        by_group.setdefault(group, []).append(session)
+
+    for group in sorted(routine, key=scheduler.group_sort_key):
+        for day in grid.days:
+            slots = routine[group].get(day, {})
+            cell, run = None, []
+            for s in grid.slots:
+                data = slots.get(s)
+                if data and data == cell:
+                    run.append(s)
+                    continue
+                if cell:
+                    add(group, day, cell, run)
+                cell, run = data, [s]
+            if cell:
+                add(group, day, cell, run)
+    return sessions, by_teacher, by_group
+
+
+def write_json(path, sessions, grid):
+    with open(path, "w") as file:
+        json.dump({"grid": grid.to_dict(), "sessions": sessions}, file, indent=2)
+
+
+def write_csv(path, sessions):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for session in sessions:
+            writer.writerow(dict(session, slots=";".join(str(s) for s in session["slots"])))
+
+
+# iCalendar (RFC 5545)
+def _ics_text(text):
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\n", "\\n"))
+
+
+def _fold(line):
+    """Split ``line`` into chunks of at most 75 octets, continuations indented"""
+    parts = []
+    current, size = "", 0
+    for ch in line:
+        width = len(ch.encode("utf-8"))
+        if size + width > 75:
+            parts.append(current)
+            current, size = " ", 1
+        current += ch
+        size += width
+    parts.append(current)
+    return "\r\n".join(parts) + "\r\n"
+
+
+def day_dates(grid, term_start):
+    """First date on or after ``term_start`` for every teaching day"""
+    names = list(calendar.day_name)
+    dates = {}
+    for day in grid.days:
+        if day not in names:
+            raise ValueError(f"'{day}' is not a weekday name, so it cannot be put on a calendar")
+        dates[day] = term_start + datetime.timedelta((names.index(day) - term_start.weekday()) % 7)
+    return dates
+
+
+def calendar_text(name, sessions, dates, weeks, stamp):
+    """One VCALENDAR with a weekly event (``weeks`` occurrences) per session.
+
+    Times are floating local times, so calendars show them as on the routine.
+    """
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//NewAway//Routine export//EN",
+             "CALSCALE:GREGORIAN", f"X-WR-CALNAME:{_ics_text(name)}"]
+    for session in sessions:
+        date = dates[session["day"]].strftime("%Y%m%d")
+        uid = scheduler.safe_name(f"{session['code']} {session['group']} {session['day']} {session['start']}")
+        summary = f"{session['code']} {session['name']}".strip()
+        description = f"{session['group']}, {session['teacher']}"
+        lines += ["BEGIN:VEVENT",
+                  f"UID:{uid}@newaway",
+                  f"DTSTAMP:{stamp}",
+                  f"DTSTART:{date}T{session['start'].replace(':', '')}00",
+                  f"DTEND:{date}T{session['end'].replace(':', '')}00",
+                  f"RRULE:FREQ=WEEKLY;COUNT={weeks}",
+                  f"SUMMARY:{_ics_text(summary)}",
+                  f"DESCRIPTION:{_ics_text(description)}"]
+        if session["room"]:
+            lines.append(f"LOCATION:{_ics_text(session['room'])}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "".join(_fold(line) for line in lines)
+
+
+def write_ics(path, name, sessions, dates, weeks, stamp):
+    with open(path, "w", newline="") as file:
+        file.write(calendar_text(name, sessions, dates, weeks, stamp))
+
+
+def export_all(routine, courses, out_dir, formats=FORMATS, grid=None, term_start=None, weeks=14):
+    """Write the requested ``formats`` for ``routine`` into ``out_dir``.
+
+    ``term_start`` (a ``datetime.date``, default today) anchors the first week
+    of the calendars and ``weeks`` is how many times each event repeats.
+    Returns the list of files written.
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export format: {', '.join(sorted(unknown))}")
+    if weeks < 1:
+        raise ValueError("weeks must be at least 1")
+    grid = grid or timegrid.DEFAULT
+    os.makedirs(out_dir, exist_ok=True)
+    sessions, by_teacher, by_group = routine_sessions(routine, courses, grid)
+
+    written = []
+    if "json" in formats:
+        written.append(os.path.join(out_dir, "routine.json"))
+        write_json(written[-1], sessions, grid)
+    if "csv" in formats:
+        written.append(os.path.join(out_dir, "routine.csv"))
+        write_csv(written[-1], sessions)
+    if "ics" in formats:
+        dates = day_dates(grid, term_start or datetime.date.today())
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        for teacher, items in by_teacher.items():
+            written.append(os.path.join(out_dir, f"teacher_{scheduler.safe_name(teacher)}.ics"))
+            write_ics(written[-1], teacher, items, dates, weeks, stamp)
+        for group in sorted(routine, key=scheduler.group_sort_key):
+            items = by_group.get(group, [])
+            if isinstance(group, tuple):
+                items = by_group.get(group[0], []) + items
+            if not items:
+                continue
+            written.append(os.path.join(out_dir, f"year_{scheduler.group_slug(group)}.ics"))
+            write_ics(written[-1], scheduler.group_name(group), items, dates, weeks, stamp)
+    return written
@@ -0,0 +1,266 @@
+"""Bulk import of teachers, preferences and courses from CSV / JSON catalogues.
+
+Usage (from the folder holding the data files):
+    python NewAway/importer.py staff.csv courses.csv
+    python NewAway/importer.py catalogue.json --dry-run
+
+Each input file is read once, record by record: ``.csv`` via DictReader,
+``.jsonl`` one object per line, ``.json`` a list of objects or an object with
+``"teachers"`` and ``"courses"`` lists. A record is a course if it has a
+``code`` (or ``kind`` = ``course``), otherwise a teacher.
+
+Teacher fields: ``name``, ``department``, ``priority``, ``slots`` (a list, or
+one string with preferences separated by ``;``). Course fields: ``code``,
+``name``, ``year``, ``credit``, ``teacher`` and optionally ``section``,
+``room_type`` and ``rooms`` (list or ``;``-separated).
+
+Everything is validated before anything is written: field types, slot
+preferences, commas in teacher names and slots (teachers.txt and
+priority.txt are comma-separated), duplicate codes (each section needs its own code, also against
+the courses already on disk), courses whose teacher is neither in
+teachers.txt nor imported, and teachers without a priority.txt entry. If
+there are no errors, each data file gets one append holding all its new
+lines. Later lines win on load, so re-imported teachers and courses are
+updated in place.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+
+import scheduler
+import storage
+import timegrid
+from resources import section_code_error
+
+
+def _split_list(value):
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value or "").split(";") if v.strip()]
+
+
+def _as_list(value, key):
+    if not isinstance(value, list):
+        raise ValueError(f"'{key}' must be a list")
+    return value
+
+
+def read_records(path):
+    """Yield ``(line, record)`` from one catalogue file"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, "r", newline="") as file:
+        if extension == ".csv":
+            for line, row in enumerate(csv.DictReader(file), start=2):
+                yield line, {k.strip(): (v or "").strip() for k, v in row.items() if k}
+        elif extension == ".jsonl":
+            for line, text in enumerate(file, start=1):
+                if text.strip():
+                    yield line, json.loads(text)
+        elif extension == ".json":
+            data = json.load(file)
+            if isinstance(data, dict):
+                data = ([dict(r, kind="teacher") if isinstance(r, dict) else r
+                         for r in _as_list(data.get("teachers", []), "teachers")]
+                        + [dict(r, kind="course") if isinstance(r, dict) else r
+                           for r in _as_list(data.get("courses", []), "courses")])
+            elif not isinstance(data, list):
+                raise ValueError("expected a list of records or an object with 'teachers' / 'courses' lists")
+            for number, record in enumerate(data, start=1):
+                yield number, record
+        else:
+            raise ValueError("unsupported file type (use .csv, .json or .jsonl)")
+
+
+def _separator_error(value):
+    """Why ``value`` cannot go into the comma-separated teachers.txt /
+    priority.txt lines, or None"""
+    if "," in value:
+        return "must not contain ','"
+    if "\n" in value or "\r" in value:
+        return "must not contain a line break"
+    return None
+
+
+def record_kind(record):
+    kind = str(record.get("kind", "")).strip().lower()
+    if kind:
+        return kind
+    return "course" if record.get("code") else "teacher"
+
+
+class ImportReport:
+    def __init__(self):
+        self.teachers = {}  # name -> department
+        self.priorities = {}  # name -> {"priority", "slots"}
+        self.courses = {}  # code -> course
+        self.errors = []
+        self.written = False
+
+    def summary(self):
+        status = "imported" if self.written else "not written"
+        return (f"{len(self.teachers)} teachers, {len(self.priorities)} preference entries, "
+                f"{len(self.courses)} courses ({status}); {len(self.errors)} errors")
+
+
+def _parse_teacher(record, where, report, grid):
+    name = str(record.get("name", "")).strip()
+    if not name:
+        report.errors.append(f"{where}: teacher without a name")
+        return
+    error = _separator_error(name)
+    if error:
+        report.errors.append(f"{where}: teacher name '{name}' {error}")
+        return
+    report.teachers[name] = str(record.get("department", "")).strip()
+    if str(record.get("priority", "")).strip() == "":
+        return
+    try:
+        priority = int(record["priority"])
+    except (TypeError, ValueError):
+        report.errors.append(f"{where}: priority of {name} must be an integer")
+        return
+    slots = _split_list(record.get("slots"))
+    for pref in slots:
+        error = _separator_error(pref)
+        if error:
+            report.errors.append(f"{where}: {name}: '{pref}' {error}")
+            continue
+        try:
+            grid.parse_preference(pref)
+        except ValueError as e:
+            report.errors.append(f"{where}: {name}: '{pref}' ({e})")
+    report.priorities[name] = {"priority": priority, "slots": slots}
+
+
+def _parse_course(record, where, report, existing):
+    missing = [f for f in ("code", "name", "year", "credit", "teacher") if str(record.get(f, "")).strip() == ""]
+    if missing:
+        report.errors.append(f"{where}: course missing {', '.join(missing)}")
+        return None
+    code = str(record["code"]).strip()
+    try:
+        course = {
+            "code": code,
+            "name": str(record["name"]).strip(),
+            "year": int(record["year"]),
+            "credit": float(record["credit"]),
+            "teacher": str(record["teacher"]).strip(),
+        }
+    except (TypeError, ValueError):
+        report.errors.append(f"{where}: {code}: year must be an integer and credit a number")
+        return None
+    if course["year"] < 1 or not 0 < course["credit"] < math.inf:
+        report.errors.append(f"{where}: {code}: year must be at least 1 and credit above 0")
+        return None
+    error = _separator_error(course["teacher"])
+    if error:
+        report.errors.append(f"{where}: {code}: teacher '{course['teacher']}' {error}")
+        return None
+    for field in ("section", "room_type"):
+        if str(record.get(field, "")).strip():
+            course[field] = str(record[field]).strip()
+    if record.get("rooms"):
+        course["rooms"] = _split_list(record["rooms"])
+    if code in report.courses:
+        error = section_code_error(report.courses[code], course) or f"duplicate course code {code}"
+        report.errors.append(f"{where}: {error}")
+    elif code in existing:
+        error = section_code_error(existing[code], course)
+        if error:
+            report.errors.append(f"{where}: {error}")
+    report.courses[code] = course
+    return course
+
+
+def validate(paths, teachers, teacher_priorities, grid=None, courses=()):
+    """Read and check every file; ``teachers`` / ``teacher_priorities`` /
+    ``courses`` are the records already on disk and slot preferences are
+    checked against ``grid``"""
+    grid = grid or timegrid.DEFAULT
+    report = ImportReport()
+    existing = {c["code"]: c for c in courses}
+    references = []  # (where, code, teacher), checked once every file is read
+    for path in paths:
+        try:
+            for line, record in read_records(path):
+                where = f"{os.path.basename(path)}:{line}"
+                if not isinstance(record, dict):
+                    report.errors.append(f"{where}: expected an object")
+                elif record_kind(record) == "course":
+                    course = _parse_course(record, where, report, existing)
+                    if course:
+                        references.append((where, course["code"], course["teacher"]))
+                elif record_kind(record) == "teacher":
+                    _parse_teacher(record, where, report, grid)
+                else:
+                    report.errors.append(f"{where}: unknown kind '{record.get('kind')}'")
+        except (OSError, ValueError, csv.Error) as e:
+            report.errors.append(f"{path}: {e}")
+
+    known_teachers = set(teachers) | set(report.teachers)
+    known_priorities = set(teacher_priorities) | set(report.priorities)
+    for where, code, teacher in references:
+        if teacher not in known_teachers:
+            report.errors.append(f"{where}: {code}: teacher '{teacher}' is not in teachers.txt")
+        elif teacher not in known_priorities:
+            report.errors.append(f"{where}: {code}: teacher '{teacher}' is missing from priority.txt")
+    for name in report.teachers:
+        if name not in known_priorities:
+            report.errors.append(f"teacher '{name}' has no priority (missing from priority.txt)")
+    return report
+
+
+def import_files(paths, teachers_file="teachers.txt", priority_file="priority.txt",
+                 courses_file="courses.txt", dry_run=False, grid=None):
+    """Validate ``paths`` and, if clean, append everything with one write per file.
+
+    Courses are written last, so a crash part-way never leaves a course whose
+    teacher is missing on disk. Returns the ``ImportReport``.
+    """
+    report = validate(paths, scheduler.load_teachers(teachers_file),
+                      scheduler.load_teacher_priorities(priority_file), grid,
+                      scheduler.load_courses(courses_file))
+    if report.errors or dry_run:
+        return report
+    if report.teachers:
+        storage.append_lines(teachers_file, ["".join(scheduler.format_teacher_line(t, d)
+                                                     for t, d in report.teachers.items())])
+    if report.priorities:
+        storage.append_lines(priority_file, ["".join(scheduler.format_priority_line(t, d)
+                                                     for t, d in report.priorities.items())])
+    if report.courses:
+        storage.CourseStore(courses_file).extend(report.courses.values())
+    report.written = True
+    return report
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Import teachers, preferences and courses in bulk.")
+    parser.add_argument("files", nargs="+", help="CSV, JSON or JSON-lines catalogues")
+    parser.add_argument("--teachers", default="teachers.txt")
+    parser.add_argument("--priorities", default="priority.txt")
+    parser.add_argument("--courses", default="courses.txt")
+    parser.add_argument("--grid", default="grid.json", help="time grid the slot preferences are checked against")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        grid = timegrid.load_grid(args.grid)
+    except (ValueError, TypeError) as e:
+        print(f"Error: {args.grid}: {e}", file=sys.stderr)
+        return 1
+    report = import_files(args.files, args.teachers, args.priorities, args.courses, args.dry_run, grid)
+    for error in report.errors:
+        print(f"Error: {error}", file=sys.stderr)
+    print(report.summary())
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
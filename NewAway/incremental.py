@@ -0,0 +1,234 @@
+"""Incremental re-solving: keep the last routine and only move what an edit touches.
+
+An edit first re-places just the affected courses around everything else
+(level 1), kept if it places at least as many of their sessions as before.
+Courses an earlier edit left short are re-tried on their own, since the edit
+may have freed room for them. If sessions are still unplaced, the courses that
+can clash with them (shared teacher, student group or room) are freed as well
+(level 2), and only then is the whole routine solved again (level 3). The
+re-try and levels 2 and 3 move courses the edit did not touch, so they are
+kept only if they place strictly more sessions; otherwise the previous
+placements are restored and the timetable does not churn.
+"""
+import time
+
+import instrument
+import scheduler
+import search
+import timegrid
+from occupancy import Occupancy
+from resources import ResourceIndex
+
+
+class IncrementalScheduler:
+    def __init__(self, teacher_priorities, teachers=(), node_limit=20000, time_limit=1.0, rooms=None,
+                 grid=None):
+        self.teacher_priorities = teacher_priorities
+        self.grid = grid or timegrid.DEFAULT
+        self.pref_index, self.pref_errors = scheduler.compile_preferences(teacher_priorities, self.grid)
+        self.teachers = list(teachers)
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.rooms = dict(rooms or {})
+        self.courses = {}  # code -> course
+        self.placements = {}  # code -> [(day, slots, room)]
+        self.index = ResourceIndex((), self.rooms)
+        self.routine = scheduler.empty_routine(grid=self.grid)
+        self.occupancy = Occupancy(self.index)
+        self.warnings = []
+        self.last_stats = {}
+        self.profile = None  # set to an instrument.Profile to instrument the next edits
+        # Optional progress(placed, total) callback and cancel event (e.g. threading.Event);
+        # a cancelled edit raises search.SearchCancelled and leaves the last routine in place
+        self.progress = None
+        self.cancel = None
+
+    # Public API
+    def solve_all(self, courses):
+        """Full solve; later edits are applied on top of this routine"""
+        start = time.perf_counter()
+        routine, diagnostics = search.solve(courses, self.teacher_priorities, self.teachers,
+                                            pref_index=self.pref_index, rooms=self.rooms,
+                                            profile=self.profile, progress=self.progress,
+                                            cancel=self.cancel, grid=self.grid)
+        self.courses = {c["code"]: c for c in courses}
+        self.index = ResourceIndex(courses, self.rooms)
+        self._load_routine(routine)
+        self.warnings = self.pref_errors + diagnostics["warnings"]
+        self.last_stats = {"level": 3, "moved": len(self.courses),
+                           "seconds": time.perf_counter() - start}
+        return self.routine
+
+    def add_course(self, course):
+        if course["code"] in self.courses:
+            self._forget(course["code"])
+        self._admit(course)
+        return self._resolve({course["code"]})
+
+    def remove_course(self, code):
+        if code not in self.courses:
+            return self.routine
+        self._forget(code)
+        # The freed slots may let a previously dropped course in
+        return self._resolve(set())
+
+    def update_preferences(self, teacher, data):
+        self.teacher_priorities[teacher] = data
+        # Recompile just this teacher's entries
+        index, errors = scheduler.compile_preferences({teacher: data}, self.grid)
+        if (teacher in self.teachers and index[teacher] == self.pref_index.get(teacher)
+                and errors == [e for e in self.pref_errors if e.startswith(f"{teacher}: ")]):
+            # Nothing the solver reads has changed
+            self.last_stats = {"level": 0, "moved": 0, "seconds": 0.0}
+            return self.routine
+        self.pref_index[teacher] = index[teacher]
+        self.pref_errors = [e for e in self.pref_errors if not e.startswith(f"{teacher}: ")] + errors
+        self.warnings = list(self.pref_errors)
+        if teacher not in self.teachers:
+            self.teachers.append(teacher)
+        return self._resolve({code for code, c in self.courses.items() if c["teacher"] == teacher})
+
+    def sync(self, courses):
+        """Apply the difference between the current catalogue and ``courses``"""
+        incoming = {c["code"]: c for c in courses}
+        changed = set()
+        for code in list(self.courses):
+            if incoming.get(code) != self.courses[code]:
+                self._forget(code)
+        for code, course in incoming.items():
+            if code not in self.courses:
+                self._admit(course)
+                changed.add(code)
+        return self._resolve(changed)
+
+    def diagnostics(self):
+        unplaced = []
+        for code, course in self.courses.items():
+            required = scheduler.required_sessions(course)
+            assigned = len(self.placements[code])
+            if assigned < required:
+                unplaced.append({"code": code, "assigned": assigned, "required": required})
+        return {"unplaced": unplaced, "warnings": list(self.warnings),
+                "incremental": dict(self.last_stats, cache=self.occupancy.cache_stats())}
+
+    # Internals
+    def _label(self, teacher):
+        return scheduler.generate_teacher_short_names([teacher])[teacher]
+
+    def _missing(self, codes):
+        return sum(scheduler.required_sessions(self.courses[code]) - len(self.placements[code])
+                   for code in codes)
+
+    def _unplaced_codes(self):
+        return {code for code in self.courses if self._missing([code]) > 0}
+
+    def _admit(self, course):
+        self.courses[course["code"]] = course
+        self.placements[course["code"]] = []
+        self.index.add(course)
+
+    def _forget(self, code):
+        self._unplace(code)
+        self.index.remove(self.courses[code])
+        del self.courses[code]
+        del self.placements[code]
+
+    def _unplace(self, code):
+        course = self.courses[code]
+        for day, slots, room in self.placements.get(code, []):
+            scheduler.unplace(self.routine, self.occupancy, course, day, slots, room)
+        self.placements[code] = []
+
+    def _place(self, code, day, slots, room=None):
+        course = self.courses[code]
+        scheduler.place(self.routine, self.occupancy, course, day, slots,
+                        self._label(course["teacher"]), room)
+        self.placements[code].append((day, slots, room))
+
+    def _neighbourhood(self, codes):
+        found = set(codes)
+        for code in codes:
+            found.update(c["code"] for c in self.index.neighbours(self.courses[code]))
+        return found
+
+    def _resolve(self, affected):
+        start = time.perf_counter()
+        affected = set(affected)
+        stuck = self._unplaced_codes() - affected
+        codes = affected | stuck
+        level, moved = 0, set()
+        if codes:
+            with instrument.phase(self.profile, "level_1"):
+                level = 1
+                if affected:
+                    moved |= self._try_subset(affected)
+                if stuck:
+                    moved |= self._try_subset(stuck, strict=True)
+            if self._missing(codes):
+                with instrument.phase(self.profile, "level_2"):
+                    level, codes = 2, self._neighbourhood(codes)
+                    moved |= self._try_subset(codes, strict=True)
+            if self._missing(codes):
+                with instrument.phase(self.profile, "level_3"):
+                    level, codes = 3, set(self.courses)
+                    moved |= self._try_subset(codes, strict=True)
+        self.last_stats = {"level": level, "moved": len(moved),
+                           "seconds": time.perf_counter() - start}
+        if self.profile is not None:
+            for code in self._unplaced_codes():
+                course = self.courses[code]
+                self.profile.record_unplaced(course, len(self.placements[code]),
+                                             scheduler.required_sessions(course),
+                                             f"still unplaced after a level {level} re-solve")
+        return self.routine
+
+    def _try_subset(self, codes, strict=False):
+        """Re-place ``codes`` around the rest; keep the result only if no worse
+        (``strict``: only if it places more sessions).
+
+        Returns the codes whose placement actually changed.
+        """
+        before = {code: list(self.placements[code]) for code in codes}
+        missing_before = self._missing(codes)
+        for code in codes:
+            self._unplace(code)
+
+        courses = [self.courses[code] for code in codes]
+        progress = None
+        if self.progress is not None:
+            settled = len(self.courses) - len(codes) - len(self._unplaced_codes() - set(codes))
+            progress = lambda placed, total: self.progress(settled + placed, len(self.courses))
+        solver = search.SearchSolver(courses, self.teacher_priorities, self.node_limit,
+                                     self.time_limit, fixed=self.occupancy, pref_index=self.pref_index,
+                                     progress=progress, cancel=self.cancel, grid=self.grid)
+        try:
+            assignment, _ = solver.run()
+        except search.SearchCancelled:
+            self._restore(before)
+            raise
+        if self.profile is not None:
+            self.profile.record_search(solver)
+        for session, (day_idx, slots, _, room) in assignment.items():
+            self._place(session.course["code"], self.grid.days[day_idx], slots, room)
+
+        missing_after = self._missing(codes)
+        if missing_after > missing_before or (strict and missing_after == missing_before):
+            self._restore(before)
+            return set()
+        return {code for code in codes if sorted(self.placements[code]) != sorted(before[code])}
+
+    def _restore(self, before):
+        for code in before:
+            self._unplace(code)
+        for code, placed in before.items():
+            for day, slots, room in placed:
+                self._place(code, day, slots, room)
+
+    def _load_routine(self, routine):
+        self.routine = scheduler.empty_routine(self.index, self.grid)
+        self.occupancy = Occupancy(self.index)
+        placements = scheduler.routine_placements(routine, list(self.courses.values()))
+        self.placements = {code: [] for code in self.courses}
+        for code, placed in placements.items():
+            for day, slots, room in placed:
+                self._place(code, day, slots, room)
@@ -0,0 +1,179 @@
+"""Optional instrumentation for the scheduling pipeline.
+
+Pass a ``Profile`` to ``scheduler.solve``, ``search.solve`` or the incremental
+engine to collect:
+
+- wall time per phase (load, even pass, odd pass, search, text build, PDF ...)
+- fit calls: how many times a solver asked whether a course fits somewhere
+- windows tried per course
+- feasibility cache hits, misses and invalidations (see ``occupancy``)
+- why each course that stayed (partly) unplaced could not be placed, and which
+  teachers' own timetables blocked the most placements
+
+Hooks registered with ``add_hook`` are called as events happen; ``to_dict``
+and ``export_json`` dump everything for later analysis. With no profile the
+solvers run exactly as before.
+"""
+import contextlib
+import json
+import sys
+import time
+
+from occupancy import Occupancy
+
+EVENTS = ("phase_start", "phase_end", "unplaced")
+
+REASONS = {
+    "teacher": "teacher busy in every free window",
+    "group": "student group busy in every free window",
+    "room": "no free room of the right type",
+    "none": "no candidate window",
+}
+
+
+class Profile:
+    def __init__(self):
+        self.phases = {}  # name -> seconds, summed over repeated phases
+        self.fit_calls = 0
+        self.windows_tried = {}  # code -> windows tried
+        self.blocked = {}  # code -> {"teacher"|"group"|"room": rejected windows}
+        self.failures = []
+        self.counters = {}
+        self.hooks = {event: [] for event in EVENTS}
+
+    def add_hook(self, event, func):
+        """Call ``func(**data)`` on ``event`` (one of ``EVENTS``)"""
+        if event not in self.hooks:
+            raise ValueError(f"Unknown event: {event}")
+        self.hooks[event].append(func)
+
+    def emit(self, event, **data):
+        for func in self.hooks[event]:
+            func(**data)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        self.emit("phase_start", name=name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+            self.emit("phase_end", name=name, seconds=seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def occupancy(self, index=None):
+        """An Occupancy that reports every window it checks to this profile"""
+        return ProfiledOccupancy(self, index)
+
+    def record_fit(self, course, blocker):
+        """``blocker`` is None when the window fit, else what rejected it"""
+        code = course["code"]
+        self.fit_calls += 1
+        self.windows_tried[code] = self.windows_tried.get(code, 0) + 1
+        if blocker:
+            counts = self.blocked.setdefault(code, {})
+            counts[blocker] = counts.get(blocker, 0) + 1
+
+    def record_unplaced(self, course, assigned, required, reason=None):
+        code = course["code"]
+        blocked = dict(self.blocked.get(code, {}))
+        if reason is None:
+            reason = REASONS[max(blocked, key=blocked.get) if blocked else "none"]
+        failure = {"code": code, "teacher": course["teacher"], "assigned": assigned,
+                   "required": required, "reason": reason, "blocked": blocked,
+                   "windows_tried": self.windows_tried.get(code, 0)}
+        self.failures.append(failure)
+        self.emit("unplaced", **failure)
+
+    def record_search(self, solver):
+        self.fit_calls += solver.checks
+        self.count("search_nodes", solver.nodes)
+        self.count("search_backjumps", solver.backjumps)
+        for session, tried in solver.tried.items():
+            code = session.course["code"]
+            self.windows_tried[code] = self.windows_tried.get(code, 0) + tried
+
+    def record_cache(self, occupancy):
+        for name, n in occupancy.cache_stats().items():
+            if name != "entries":
+                self.count(f"cache_{name}", n)
+
+    def merge(self, other):
+        """Fold another profile's counts into this one"""
+        for name, seconds in other.phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        for name, n in other.counters.items():
+            self.count(name, n)
+        for code, tried in other.windows_tried.items():
+            self.windows_tried[code] = self.windows_tried.get(code, 0) + tried
+        for code, counts in other.blocked.items():
+            mine = self.blocked.setdefault(code, {})
+            for blocker, n in counts.items():
+                mine[blocker] = mine.get(blocker, 0) + n
+        self.fit_calls += other.fit_calls
+        for failure in other.failures:
+            self.failures.append(failure)
+            self.emit("unplaced", **failure)
+
+    def bottlenecks(self, courses, top=10):
+        """Teachers whose own timetables rejected the most windows"""
+        teacher_of = {c["code"]: c["teacher"] for c in courses}
+        totals = {}
+        for code, counts in self.blocked.items():
+            if counts.get("teacher") and code in teacher_of:
+                teacher = teacher_of[code]
+                totals[teacher] = totals.get(teacher, 0) + counts["teacher"]
+        return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+    def to_dict(self, courses=()):
+        data = {
+            "phases": dict(self.phases),
+            "fit_calls": self.fit_calls,
+            "windows_tried": dict(self.windows_tried),
+            "failures": list(self.failures),
+            "counters": dict(self.counters),
+        }
+        if courses:
+            data["bottlenecks"] = [{"teacher": t, "rejected": n} for t, n in self.bottlenecks(courses)]
+        return data
+
+    def export_json(self, path, courses=()):
+        """Write ``to_dict`` as JSON to ``path`` ('-' for stdout)"""
+        if path == "-":
+            json.dump(self.to_dict(courses), sys.stdout, indent=2)
+            print()
+        else:
+            with open(path, "w") as file:
+                json.dump(self.to_dict(courses), file, indent=2)
+
+    def summary(self):
+        phases = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.phases.items())
+        return f"{phases}; {self.fit_calls} fit calls; {len(self.failures)} placement failures"
+
+
+class ProfiledOccupancy(Occupancy):
+    def __init__(self, profile, index=None):
+        Occupancy.__init__(self, index)
+        self.profile = profile
+
+    def find_place(self, course, day, mask):
+        result = Occupancy.find_place(self, course, day, mask)
+        self.profile.record_fit(course, None if result[0] else self.blocker(course, day, mask))
+        return result
+
+    def first_fit(self, course, day, windows):
+        # Window by window, so every rejection is counted with its reason
+        for slots, mask in windows:
+            fits, room = self.find_place(course, day, mask)
+            if fits:
+                return slots, room
+        return None, None
+
+
+def phase(profile, name):
+    """``profile.phase(name)``, or a no-op context when not profiling"""
+    return profile.phase(name) if profile is not None else contextlib.nullcontext()
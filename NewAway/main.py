@@ -1,14 +1,19 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-import json
 import os
-from collections import defaultdict
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer
-from reportlab.lib import colors
-
-DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
-SLOTS = [1, 2, 3, 4, 5, 6, 7, 8]  # Removed 9
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+import importer
+import incremental
+import instrument
+import render
+import scheduler
+import search
+import storage
+import timegrid
+from resources import load_rooms, section_code_error
+from schedule_view import ScheduleView
 
 class CourseSchedulerApp:
     def __init__(self, root):
@@ -19,11 +24,33 @@ class CourseSchedulerApp:
         self.teachers_file = "teachers.txt"
         self.courses_file = "courses.txt"
         self.priority_file = "priority.txt"
+        self.rooms_file = "rooms.txt"
+        self.grid_file = "grid.json"
+        # Set NEWAWAY_PROFILE=profile.json to print and save the profile of every generation
+        self.profile_file = os.environ.get("NEWAWAY_PROFILE")
+        self.course_store = storage.CourseStore(self.courses_file)
         
         # Load data
-        self.teachers = self.load_teachers()
+        self.teacher_departments = self.load_teacher_departments()
+        self.teachers = list(self.teacher_departments)
         self.teacher_priorities = self.load_teacher_priorities()
         self.courses = self.load_courses()
+        self.rooms = load_rooms(self.rooms_file)
+        self.grid = self.load_grid()
+        # Keeps the last solved routine so edits only re-place what they touch
+        self.engine = None
+        self.engine_version = None
+        # (event, func) pairs registered on the profile of every generation;
+        # they run on the worker thread
+        self.profile_hooks = []
+        self.last_profile = None
+        # Background generation: the worker posts to the queue, the Tk loop polls it
+        self.worker = None
+        self.worker_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        # Teacher edits not yet applied to the engine; the next generation applies
+        # them on the worker thread, so the engine is only ever touched there
+        self.pending_preferences = []
 
         # Setup GUI
         self.notebook = ttk.Notebook(root)
@@ -35,56 +62,40 @@ class CourseSchedulerApp:
         self.setup_schedule_tab()
 
         self.update_teacher_combo()
-        ttk.Button(root, text="Generate Routine PDF", command=self.generate_pdf).pack(pady=10)
+        self.report_invalid_preferences()
+        self.generate_button = ttk.Button(root, text="Generate Routine PDF", command=self.generate_pdf)
+        self.generate_button.pack(pady=10)
 
     # Data Loading/Saving Methods
-    def load_teachers(self):
-        if os.path.exists(self.teachers_file):
-            with open(self.teachers_file, "r") as file:
-                return [line.strip() for line in file.readlines()]
-        return []
+    def load_teacher_departments(self):
+        return scheduler.load_teacher_departments(self.teachers_file)
 
     def load_teacher_priorities(self):
-        if os.path.exists(self.priority_file):
-            priorities = {}
-            with open(self.priority_file, "r") as file:
-                for line in file.readlines():
-                    try:
-                        parts = line.strip().split(",")
-                        if len(parts) >= 3:
-                            teacher = parts[0].strip()
-                            priority = int(parts[1].strip())
-                            slots = [s.strip().strip("'") for s in parts[2:]]
-                            priorities[teacher] = {"priority": priority, "slots": slots}
-                    except (ValueError, IndexError) as e:
-                        print(f"Skipping invalid line: {line.strip()} (Error: {e})")
-            return priorities
-        return {}
-
-    def save_teacher_priorities(self):
-        with open(self.priority_file, "w") as file:
-            for teacher, data in self.teacher_priorities.items():
-                file.write(f"{teacher},{data['priority']}," + ",".join(f"'{s}'" for s in data["slots"]) + "\n")
-
-    def save_teachers(self):
-        with open(self.teachers_file, "w") as file:
-            file.writelines(f"{teacher}\n" for teacher in self.teachers)
+        return scheduler.load_teacher_priorities(self.priority_file)
 
-    def load_courses(self):
-        if os.path.exists(self.courses_file):
-            with open(self.courses_file, "r") as file:
-                return [json.loads(line.strip()) for line in file.readlines()]
-        return []
+    def load_grid(self):
+        try:
+            return timegrid.load_grid(self.grid_file)
+        except (ValueError, TypeError) as e:
+            messagebox.showwarning("Invalid Time Grid", f"{self.grid_file}: {e}\nUsing the default week.")
+            return timegrid.DEFAULT
 
-    def save_courses(self):
-        with open(self.courses_file, "w") as file:
-            file.writelines(f"{json.dumps(course)}\n" for course in self.courses)
+    def load_courses(self):
+        return self.course_store.load()
 
     # GUI Setup Methods
     def setup_input_tab(self):
         input_frame = ttk.Frame(self.notebook)
         self.notebook.add(input_frame, text="Input")
-        ttk.Label(input_frame, text="(Input tab can be used for consolidated data or initial options.)").pack(pady=20)
+        ttk.Label(input_frame, text="Import teachers, preferences and courses from CSV / JSON files. "
+                                    "Nothing is written unless every record is valid.").pack(pady=(20, 10))
+        buttons = ttk.Frame(input_frame)
+        buttons.pack()
+        self.import_dry_run = tk.BooleanVar(value=False)
+        ttk.Button(buttons, text="Import Files...", command=self.import_files).pack(side='left', padx=5)
+        ttk.Checkbutton(buttons, text="Validate only", variable=self.import_dry_run).pack(side='left', padx=5)
+        self.import_log = tk.Text(input_frame, height=15, width=90)
+        self.import_log.pack(padx=10, pady=10, fill='both', expand=True)
 
     def setup_teacher_tab(self):
         teacher_frame = ttk.Frame(self.notebook)
@@ -133,18 +144,32 @@ class CourseSchedulerApp:
         self.teacher_combo = ttk.Combobox(course_frame)
         self.teacher_combo.grid(row=4, column=1, padx=5, pady=5)
 
-        ttk.Button(course_frame, text="Add Course", command=self.add_course).grid(row=5, column=0, padx=5, pady=10)
-        ttk.Button(course_frame, text="Remove Course", command=self.remove_course).grid(row=5, column=1, padx=5, pady=10)
-        ttk.Button(course_frame, text="Clear", command=self.clear_course_entries).grid(row=5, column=2, padx=5, pady=10)
+        ttk.Label(course_frame, text="Section (optional):").grid(row=5, column=0, padx=5, pady=5, sticky='w')
+        self.section_entry = ttk.Entry(course_frame)
+        self.section_entry.grid(row=5, column=1, padx=5, pady=5)
+
+        ttk.Button(course_frame, text="Add Course", command=self.add_course).grid(row=6, column=0, padx=5, pady=10)
+        ttk.Button(course_frame, text="Remove Course", command=self.remove_course).grid(row=6, column=1, padx=5, pady=10)
+        ttk.Button(course_frame, text="Clear", command=self.clear_course_entries).grid(row=6, column=2, padx=5, pady=10)
 
         self.course_log = tk.Text(course_frame, height=8, width=60)
-        self.course_log.grid(row=6, column=0, columnspan=3, padx=5, pady=10)
+        self.course_log.grid(row=7, column=0, columnspan=3, padx=5, pady=10)
 
     def setup_schedule_tab(self):
         schedule_frame = ttk.Frame(self.notebook)
         self.notebook.add(schedule_frame, text="Schedule Info")
-        self.schedule_label = ttk.Label(schedule_frame, text="Schedule Information will appear here after generating the schedule.", wraplength=600, justify="left")
-        self.schedule_label.pack(padx=10, pady=10)
+        progress_frame = ttk.Frame(schedule_frame)
+        progress_frame.pack(fill='x', padx=10, pady=(10, 0))
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate", length=300)
+        self.progress_bar.pack(side='left')
+        self.progress_label = ttk.Label(progress_frame, text="")
+        self.progress_label.pack(side='left', padx=10)
+        self.cancel_button = ttk.Button(progress_frame, text="Cancel", command=self.cancel_generation,
+                                        state='disabled')
+        self.cancel_button.pack(side='left')
+
+        self.schedule_view = ScheduleView(schedule_frame, self.grid)
+        self.schedule_view.pack(fill='both', expand=True, padx=10, pady=10)
 
     # Core Functionality Methods
     def add_teacher(self):
@@ -158,9 +183,11 @@ class CourseSchedulerApp:
                 priority = int(priority)
                 if name not in self.teachers:
                     self.teachers.append(name)
+                    self.teacher_departments[name] = dept
                     self.teacher_priorities[name] = {"priority": priority, "slots": slot_prefs}
-                    self.save_teachers()
-                    self.save_teacher_priorities()
+                    scheduler.append_teacher(self.teachers_file, name, dept)
+                    scheduler.append_teacher_priority(self.priority_file, name, self.teacher_priorities[name])
+                    self.queue_preferences(name)
                     self.update_teacher_combo()
                     messagebox.showinfo("Success", f"Teacher {name} added successfully!")
                 else:
@@ -174,12 +201,37 @@ class CourseSchedulerApp:
         else:
             messagebox.showerror("Error", "Please fill all teacher fields.")
 
+    def import_files(self):
+        paths = filedialog.askopenfilenames(
+            title="Import catalogue files",
+            filetypes=[("Catalogues", "*.csv *.json *.jsonl"), ("All files", "*.*")])
+        if not paths:
+            return
+        report = importer.import_files(paths, self.teachers_file, self.priority_file, self.courses_file,
+                                       self.import_dry_run.get(), self.grid)
+        self.import_log.insert(tk.END, f"{', '.join(paths)}\n")
+        for error in report.errors:
+            self.import_log.insert(tk.END, f"  Error: {error}\n")
+        self.import_log.insert(tk.END, f"  {report.summary()}\n")
+        self.import_log.see(tk.END)
+        if not report.written:
+            return
+
+        self.teacher_departments = self.load_teacher_departments()
+        self.teachers = list(self.teacher_departments)
+        self.teacher_priorities = self.load_teacher_priorities()
+        self.courses = self.load_courses()
+        for name in report.priorities:
+            self.queue_preferences(name)
+        self.update_teacher_combo()
+
     def add_course(self):
         code = self.course_code_entry.get().strip()
         name = self.course_name_entry.get().strip()
         year = self.year_spinbox.get()
         credit = self.credit_spinbox.get().strip()
         teacher = self.teacher_combo.get().strip()
+        section = self.section_entry.get().strip()
 
         if all([code, name, year, credit, teacher]):
             try:
@@ -190,9 +242,24 @@ class CourseSchedulerApp:
                     "credit": float(credit),
                     "teacher": teacher,
                 }
-                self.courses.append(course)
-                self.save_courses()
-                log = f"Course added: {code} ({name}) for Year {year} with {credit} credit(s), Teacher: {teacher}\n"
+                if section:
+                    course["section"] = section
+                # Courses are keyed by code, so adding an existing code replaces that course;
+                # a second section of a course needs a code of its own
+                existing = next((c for c in self.load_courses() if c["code"] == code), None)
+                error = existing and section_code_error(existing, course)
+                if error:
+                    messagebox.showerror("Error", error[0].upper() + error[1:] + ".")
+                    return
+                if existing and not messagebox.askyesno(
+                        "Update Course", f"Course {code} ({existing['name']}) already exists. Replace it?"):
+                    return
+                self.course_store.append(course)
+                # The engine catches up on the next generation's sync
+                self.courses = self.load_courses()
+                action = "updated" if existing else "added"
+                log = (f"Course {action}: {code} ({name}) for Year {year} with {credit} credit(s), "
+                       f"Teacher: {teacher}\n")
                 self.course_log.insert(tk.END, log)
                 self.clear_course_entries()
             except ValueError:
@@ -201,237 +268,136 @@ class CourseSchedulerApp:
             messagebox.showerror("Error", "Please fill all course fields.")
 
     def generate_pdf(self):
-        """Main scheduling function with backtracking"""
+        """Main scheduling function; solving and rendering run on a worker thread
+        so the window stays responsive. The last routine stays on screen until
+        the new one is ready."""
+        if self.worker:
+            return
         self.courses = self.load_courses()
         if not self.courses:
             messagebox.showerror("Error", "No courses available to generate schedule.")
             return
 
-        # Initialize data structures
-        teacher_schedule = defaultdict(lambda: {day: set() for day in DAYS})
-        routine = {year: {day: {slot: None for slot in SLOTS} for day in DAYS} 
-                  for year in [1, 2, 3, 4]}
-        teacher_short_names = self._generate_teacher_short_names()
-
-        # Sort by priorities
-        sorted_teachers = sorted(self.teacher_priorities.items(), 
-                               key=lambda x: x[1]["priority"])
-        teacher_rank = {teacher: idx for idx, (teacher, _) in enumerate(sorted_teachers)}
-        self.courses.sort(key=lambda c: teacher_rank.get(c["teacher"], float("inf")))
-        
-        # Process even courses with backtracking
-        self._process_even_courses(routine, teacher_schedule, teacher_short_names)
-        
-        # Process odd courses
-        self._process_odd_courses(routine, teacher_schedule, teacher_short_names)
-        
-        # Generate output
-        schedule_text = self._generate_schedule_text(routine)
-        self.update_schedule_info(schedule_text)
-        self._create_pdf(routine, teacher_short_names)
-
-    def _process_even_courses(self, routine, teacher_schedule, teacher_short_names):
-        """Backtracking for even courses: assign 3 consecutive slots (no break slot)"""
-        even_courses = [c for c in self.courses if self._is_even_course(c["code"])]
-        for course in even_courses:
-            assigned = False
-            teacher = course["teacher"]
-            year = course["year"]
-            code = course["code"]
-
-            # Try teacher's preferences first
-            if teacher in self.teacher_priorities:
-                for pref in self.teacher_priorities[teacher]["slots"]:
-                    try:
-                        day, time_range = pref.split(" ", 1)
-                        slots = self._parse_time_range(time_range)
-                        # Try all possible 3-slot windows in this preference, skipping break slot
-                        for i in range(len(slots) - 2):
-                            window = slots[i:i+3]
-                            if 5 in window:  # skip if break slot is in window
-                                continue
-                            if all(self._can_assign(teacher, year, day, s, routine, teacher_schedule) for s in window):
-                                for s in window:
-                                    routine[year][day][s] = (code, teacher_short_names[teacher])
-                                    teacher_schedule[teacher][day].add(s)
-                                assigned = True
-                                break
-                        if assigned:
-                            break
-                    except (ValueError, IndexError):
-                        continue
-
-            # If not assigned, try all possible days and slots (backtracking)
-            if not assigned:
-                for day in DAYS:
-                    for start_slot in SLOTS:
-                        if start_slot > max(SLOTS) - 2 or 5 in [start_slot, start_slot+1, start_slot+2]:
-                            continue  # skip if break slot is in window
-                        window = [start_slot, start_slot+1, start_slot+2]
-                        if all(self._can_assign(teacher, year, day, s, routine, teacher_schedule) for s in window):
-                            for s in window:
-                                routine[year][day][s] = (code, teacher_short_names[teacher])
-                                teacher_schedule[teacher][day].add(s)
-                            assigned = True
-                            break
-                    if assigned:
-                        break
-            if not assigned:
-                print(f"Warning: Could not assign even course {code}")
-
-    def _process_odd_courses(self, routine, teacher_schedule, teacher_short_names):
-        """Assign odd courses: one slot per day, split across days, with backtracking"""
-        odd_courses = [c for c in self.courses if not self._is_even_course(c["code"])]
-        for course in odd_courses:
-            teacher = course["teacher"]
-            year = course["year"]
-            code = course["code"]
-            credit = int(course["credit"])
-            assigned_slots = 0
-            used_days = set()
-
-            # Try teacher's preferences first
-            if teacher in self.teacher_priorities:
-                for pref in self.teacher_priorities[teacher]["slots"]:
-                    if assigned_slots >= credit:
-                        break
-                    try:
-                        day, time_range = pref.split(" ", 1)
-                        if day in used_days:
-                            continue  # don't assign more than one slot per day for this course
-                        slots = self._parse_time_range(time_range)
-                        for slot in slots:
-                            if self._can_assign(teacher, year, day, slot, routine, teacher_schedule):
-                                routine[year][day][slot] = (code, teacher_short_names[teacher])
-                                teacher_schedule[teacher][day].add(slot)
-                                assigned_slots += 1
-                                used_days.add(day)
-                                break
-                    except (ValueError, IndexError):
-                        continue
-
-            # If not enough slots assigned, try all days/slots (backtracking)
-            if assigned_slots < credit:
-                for day in DAYS:
-                    if assigned_slots >= credit:
-                        break
-                    if day in used_days:
-                        continue
-                    for slot in SLOTS:
-                        if self._can_assign(teacher, year, day, slot, routine, teacher_schedule):
-                            routine[year][day][slot] = (code, teacher_short_names[teacher])
-                            teacher_schedule[teacher][day].add(slot)
-                            assigned_slots += 1
-                            used_days.add(day)
-                            break
-            if assigned_slots < credit:
-                print(f"Warning: Only assigned {assigned_slots}/{credit} slots for {code}")
-
-    # Helper Methods
-    def _is_even_course(self, code):
-        numeric_part = ''.join(filter(str.isdigit, code))
-        return int(numeric_part) % 2 == 0 if numeric_part else False
-
-    def _assign_consecutive_slots(self, teacher, year, day, start_slot, code, 
-                                routine, teacher_schedule, teacher_short_names):
-        """Try to assign 3 consecutive slots"""
-        for slot in range(start_slot, start_slot + 3):
-            if not self._can_assign(teacher, year, day, slot, routine, teacher_schedule):
-                return False
-        
-        for slot in range(start_slot, start_slot + 3):
-            routine[year][day][slot] = (code, teacher_short_names[teacher])
-            teacher_schedule[teacher][day].add(slot)
-        return True
+        # The worker gets its own copies: the Tk thread keeps editing these while it runs
+        engine = self.engine
+        if engine is None:
+            engine = incremental.IncrementalScheduler(dict(self.teacher_priorities), list(self.teachers),
+                                                      rooms=self.rooms, grid=self.grid)
+            edits = []  # already in the copies
+        else:
+            edits = self.pending_preferences
+        self.pending_preferences = []
+        version = self.course_store.version
+        self.cancel_event.clear()
+        self.worker = threading.Thread(
+            target=self._generate_worker,
+            args=(engine, engine is not self.engine, edits, list(self.courses), version,
+                  version != self.engine_version, self._generate_teacher_short_names()),
+            daemon=True)
+        self.generate_button.config(state='disabled')
+        self.cancel_button.config(state='normal')
+        self.show_progress(0, len(self.courses))
+        self.worker.start()
+        self.root.after(100, self.poll_worker)
+
+    def _generate_worker(self, engine, fresh, edits, courses, version, needs_sync, teacher_short_names):
+        """Runs off the Tk thread: never touches widgets, only posts to the queue.
+
+        A ``fresh`` engine solves from scratch; a kept one applies the queued
+        teacher ``edits`` and, if the catalogue changed, syncs to ``courses``.
+        """
+        profile = instrument.Profile()
+        for event, func in self.profile_hooks:
+            profile.add_hook(event, func)
+        engine.profile = profile
+        engine.progress = lambda placed, total: self.worker_queue.put(("progress", placed, total))
+        engine.cancel = self.cancel_event
+        try:
+            with profile.phase("solve"):
+                if fresh:
+                    engine.solve_all(courses)
+                else:
+                    for name, data in edits:
+                        engine.update_preferences(name, data)
+                    if needs_sync:
+                        # Course edits from the app and from courses.txt alike
+                        engine.sync(courses)
+            # A snapshot, so later edits to the engine don't change what is on screen
+            routine = {group: {day: dict(slots) for day, slots in days.items()}
+                       for group, days in engine.routine.items()}
+            diagnostics = engine.diagnostics()
+            self.worker_queue.put(("progress", len(courses) - len(diagnostics["unplaced"]), len(courses)))
+            with profile.phase("pdf_build"):
+                render.create_pdf(routine, teacher_short_names, grid=self.grid)
+            self.worker_queue.put(("done", engine, version, routine, diagnostics, profile))
+        except search.SearchCancelled:
+            self.worker_queue.put(("cancelled", bool(edits)))
+        except Exception as error:
+            self.worker_queue.put(("error", str(error)))
+        finally:
+            engine.profile = engine.progress = engine.cancel = None
+
+    def poll_worker(self):
+        """Drain the worker's queue on the Tk thread; reschedules itself until done"""
+        try:
+            while True:
+                message = self.worker_queue.get_nowait()
+                if message[0] == "progress":
+                    self.show_progress(message[1], message[2])
+                else:
+                    self.finish_generation(message)
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_worker)
+
+    def finish_generation(self, message):
+        self.worker = None
+        self.generate_button.config(state='normal')
+        self.cancel_button.config(state='disabled')
+        kind = message[0]
+        if kind == "done":
+            _, engine, version, routine, diagnostics, profile = message
+            self.engine = engine
+            self.engine_version = version
+            for warning in diagnostics["warnings"]:
+                print(f"Warning: {warning}")
+            for item in diagnostics["unplaced"]:
+                print(f"Warning: Only assigned {item['assigned']}/{item['required']} slots for {item['code']}")
+            self.update_schedule_info(routine)
+            if self.profile_file:
+                print(f"Profile: {profile.summary()}")
+                profile.export_json(self.profile_file, self.courses)
+            self.last_profile = profile
+            self.progress_label.config(text="Done")
+            messagebox.showinfo("PDF Generated", "Routine saved as 'routine_final.pdf'.")
+        elif kind == "cancelled":
+            if message[1]:
+                # Some teacher edits may not have been applied; start over next time
+                self.engine = None
+            self.progress_label.config(text="Cancelled; showing the previous routine")
+        else:
+            # The engine may be half way through an edit
+            self.engine = None
+            self.progress_label.config(text="Failed")
+            messagebox.showerror("Error", f"Could not generate the routine: {message[1]}")
+
+    def cancel_generation(self):
+        if self.worker:
+            self.cancel_event.set()
+            self.progress_label.config(text="Cancelling...")
+
+    def queue_preferences(self, name):
+        """Hand a teacher's new preferences to the engine on the next generation"""
+        data = self.teacher_priorities[name]
+        self.pending_preferences.append((name, dict(data, slots=list(data["slots"]))))
 
-    def _can_assign(self, teacher, year, day, slot, routine, teacher_schedule):
-        """Check if slot is available"""
-        return (slot in SLOTS and 
-                routine[year][day][slot] is None and 
-                slot not in teacher_schedule[teacher][day])
+    def show_progress(self, placed, total):
+        self.progress_bar.config(maximum=max(total, 1), value=placed)
+        self.progress_label.config(text=f"{placed}/{total} courses placed")
 
     def _generate_teacher_short_names(self):
-        return {teacher: ''.join([name[0].upper() for name in teacher.split()])
-                for teacher in self.teachers}
-
-    def _generate_schedule_text(self, routine):
-        text = "Generated Schedule:\n\n"
-        for year, days in routine.items():
-            text += f"Year {year}:\n"
-            for day, slots in days.items():
-                text += f"  {day}:\n"
-                for slot, data in slots.items():
-                    if data:
-                        text += f"    Slot {slot}: {data[0]} (Teacher: {data[1]})\n"
-                    else:
-                        text += f"    Slot {slot}: Free\n"
-            text += "\n"
-        return text
-
-    def _create_pdf(self, routine, teacher_short_names):
-        slot_times = {
-            1: "9-10",
-            2: "10-11",
-            3: "11-12",
-            4: "12-1",
-            5: "1-2",
-            6: "2-3",
-            7: "3-4",
-            8: "4-5"
-        }
-        
-        # Main table data
-        table_data = [["Day", "Year"] + [slot_times[s] for s in SLOTS]]
-        year_names = ["1st Year", "2nd Year", "3rd Year", "4th Year"]
-
-        for day in DAYS:
-            for yr in [1, 2, 3, 4]:
-                row = [day if yr == 1 else "", year_names[yr - 1]]
-                for s in SLOTS:
-                    if s == 5:
-                        row.append("Break")
-                    else:
-                        data = routine[yr][day][s]
-                        row.append(f"{data[0]}\n({data[1]})" if data else "")
-                table_data.append(row)
-
-        # Teacher reference table
-        teacher_table_data = [["Short Name", "Full Name"]]
-        for teacher, short_name in teacher_short_names.items():
-            teacher_table_data.append([short_name, teacher])
-
-        # Create PDF
-        pdf = SimpleDocTemplate("routine_final.pdf", pagesize=landscape(letter))
-        
-        # Style main table
-        main_table = Table(table_data, colWidths=[70, 90] + [80] * len(SLOTS))
-        main_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.beige, colors.whitesmoke]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ]))
-
-        # Style teacher table
-        teacher_table = Table(teacher_table_data, colWidths=[150, 300])
-        teacher_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.beige, colors.whitesmoke]), 
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ]))
-
-        spacer = Spacer(1, 20)
-        pdf.build([main_table, spacer, teacher_table])
-        messagebox.showinfo("PDF Generated", "Routine saved as 'routine_final.pdf'.")
+        return scheduler.generate_teacher_short_names(self.teachers)
 
     # Utility Methods
     def validate_float_input(self, value):
@@ -443,11 +409,26 @@ class CourseSchedulerApp:
         except ValueError:
             return False
 
+    def report_invalid_preferences(self):
+        _, errors = scheduler.compile_preferences(self.teacher_priorities, self.grid)
+        if errors:
+            messagebox.showwarning("Invalid Preferences",
+                                   "These slot preferences were ignored:\n" + "\n".join(errors))
+
     def update_teacher_combo(self):
         self.teacher_combo["values"] = self.teachers
 
     def remove_course(self):
-        messagebox.showinfo("Remove Course", "Feature not implemented yet.")
+        code = self.course_code_entry.get().strip()
+        if not code:
+            messagebox.showerror("Error", "Enter the code of the course to remove.")
+            return
+        if not self.course_store.remove(code):
+            messagebox.showwarning("Warning", f"Course {code} not found.")
+            return
+        self.courses = self.load_courses()
+        self.course_log.insert(tk.END, f"Course removed: {code}\n")
+        self.clear_course_entries()
 
     def clear_course_entries(self):
         self.course_code_entry.delete(0, tk.END)
@@ -455,31 +436,10 @@ class CourseSchedulerApp:
         self.year_spinbox.set(1)
         self.credit_spinbox.delete(0, tk.END)
         self.teacher_combo.set('')
+        self.section_entry.delete(0, tk.END)
 
-    def update_schedule_info(self, schedule_text):
-        self.schedule_label.config(text=schedule_text)
-
-    def _parse_time_range(self, time_range):
-        time_map = {
-            "9am-10am": 1,
-            "10am-11am": 2,
-            "11am-12pm": 3,
-            "12pm-1pm": 4,
-            "1pm-2pm": 5,
-            "2pm-3pm": 6,
-            "3pm-4pm": 7,
-            "4pm-5pm": 8
-        }
-        try:
-            start, end = time_range.split("-")
-            slots = [slot for time, slot in time_map.items() 
-                    if time.startswith(start) or time.endswith(end)]
-            if not slots:
-                raise KeyError(f"Invalid time range: {time_range}")
-            return slots
-        except KeyError as e:
-            messagebox.showerror("Error", f"Invalid time range: {e}")
-            return []
+    def update_schedule_info(self, routine):
+        self.schedule_view.show(routine, self.courses)
 
 if __name__ == "__main__":
     root = tk.Tk()
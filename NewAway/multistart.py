@@ -0,0 +1,69 @@
+"""Multi-start solving: run the greedy passes over many perturbed course orders
+in a process pool and keep the best-scoring routine.
+
+Start 0 always uses the plain teacher-priority order; every other start adds
+random noise to each course's priority rank. Each start draws from its own
+``random.Random`` seeded from ``(seed, start)``, so a given seed reproduces the
+same orders and therefore the same winner regardless of the worker count.
+"""
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import scheduler
+import scoring
+
+
+def perturbed_order(courses, teacher_priorities, seed, start, spread=3.0):
+    """Course order for one start: priority rank plus uniform noise in [0, spread)"""
+    rank = scheduler.teacher_rank(teacher_priorities)
+    worst = len(rank)
+    if start == 0:
+        return sorted(courses, key=lambda c: rank.get(c["teacher"], worst))
+    rng = random.Random(seed * 1000003 + start)
+    noisy = [(rank.get(c["teacher"], worst) + rng.uniform(0, spread), i) for i, c in enumerate(courses)]
+    return [courses[i] for _, i in sorted(noisy)]
+
+
+def _run_start(job):
+    courses, teacher_priorities, teachers, pref_index, rooms, grid, seed, start = job
+    ordered = perturbed_order(courses, teacher_priorities, seed, start)
+    routine, diagnostics = scheduler.solve(ordered, teacher_priorities, teachers, pref_index,
+                                           keep_order=True, rooms=rooms, grid=grid)
+    score = scoring.score_routine(routine, courses, pref_index, diagnostics, grid)
+    return start, score, routine, diagnostics
+
+
+def solve(courses, teacher_priorities, teachers=(), starts=8, seed=None, workers=None,
+          pref_index=None, rooms=None, grid=None):
+    """Same return shape as ``scheduler.solve``; ``diagnostics["multistart"]``
+    records the seed, the winning start and its score.
+
+    ``workers`` defaults to the CPU count; ``workers=1`` runs in-process.
+    """
+    warnings = []
+    if pref_index is None:
+        pref_index, warnings = scheduler.compile_preferences(teacher_priorities, grid)
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    teachers = list(teachers)
+    jobs = [(courses, teacher_priorities, teachers, pref_index, rooms, grid, seed, start)
+            for start in range(starts)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or starts == 1:
+        results = [_run_start(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, starts)) as pool:
+            results = list(pool.map(_run_start, jobs))
+
+    # Ties go to the lowest start index so the result does not depend on timing
+    best_start, best_score, routine, diagnostics = min(results, key=lambda r: (r[1]["key"], r[0]))
+    diagnostics["warnings"] = warnings + diagnostics["warnings"]
+    diagnostics["multistart"] = {
+        "seed": seed,
+        "starts": starts,
+        "best_start": best_start,
+        "score": {k: v for k, v in best_score.items() if k != "key"},
+    }
+    return routine, diagnostics
@@ -0,0 +1,173 @@
+"""Compact occupancy model for the solver.
+
+Every (group, day), (teacher, day) and (room, day) triple owns one integer
+whose bit ``slot - 1`` is set when that slot is taken, so checking a whole
+lab window is one AND and assigning or rolling it back is one OR / AND-NOT.
+A group is a year or a ``(year, section)`` pair (see ``resources``).
+
+Course-level checks go through a feasibility cache: the union of the slots
+blocked for a (teacher, group, day) is computed once and reused for every
+window tried on that day, by the greedy passes and by the search solver
+when it filters values against a fixed occupancy. Each cached entry is
+registered under the teacher and every group it read, so assigning or
+releasing slots drops exactly the entries that depended on them.
+"""
+from resources import ResourceIndex, group_of
+
+
+def slot_bit(slot):
+    return 1 << (slot - 1)
+
+
+def window_mask(slots):
+    mask = 0
+    for slot in slots:
+        mask |= 1 << (slot - 1)
+    return mask
+
+
+def mask_slots(mask):
+    """List the slot numbers set in ``mask`` in ascending order"""
+    slots = []
+    slot = 1
+    while mask:
+        if mask & 1:
+            slots.append(slot)
+        mask >>= 1
+        slot += 1
+    return slots
+
+
+class Occupancy:
+    def __init__(self, index=None):
+        self.index = index if index is not None else ResourceIndex()
+        self.year_masks = {}
+        self.teacher_masks = {}
+        self.room_masks = {}
+        self.clear_cache()
+
+    # Feasibility cache
+    def clear_cache(self):
+        self._blocked = {}  # (teacher, group, day) -> mask of slots the course can't use
+        self._by_teacher = {}  # (teacher, day) -> cache keys that read it
+        self._by_group = {}  # (group, day) -> cache keys that read it
+        self._index_version = self.index.version
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_invalidations = 0
+
+    def cache_stats(self):
+        return {"hits": self.cache_hits, "misses": self.cache_misses,
+                "invalidations": self.cache_invalidations, "entries": len(self._blocked)}
+
+    def blocked_mask(self, course, day):
+        """Slots on ``day`` taken by the course's teacher or any group it clashes with"""
+        if self._index_version != self.index.version:
+            # A new section changed what a year has to check
+            self._blocked, self._by_teacher, self._by_group = {}, {}, {}
+            self._index_version = self.index.version
+        teacher = course["teacher"]
+        key = (teacher, group_of(course), day)
+        mask = self._blocked.get(key)
+        if mask is not None:
+            self.cache_hits += 1
+            return mask
+        self.cache_misses += 1
+        mask = self.teacher_masks.get((teacher, day), 0)
+        self._by_teacher.setdefault((teacher, day), set()).add(key)
+        for group in self.index.checks(course):
+            mask |= self.year_masks.get((group, day), 0)
+            self._by_group.setdefault((group, day), set()).add(key)
+        self._blocked[key] = mask
+        return mask
+
+    def _invalidate(self, teacher, group, day):
+        for key in self._by_teacher.pop((teacher, day), ()):
+            if self._blocked.pop(key, None) is not None:
+                self.cache_invalidations += 1
+        for key in self._by_group.pop((group, day), ()):
+            if self._blocked.pop(key, None) is not None:
+                self.cache_invalidations += 1
+
+    # Raw resource masks
+    def assign(self, teacher, year, day, mask):
+        self._invalidate(teacher, year, day)
+        self.year_masks[(year, day)] = self.year_masks.get((year, day), 0) | mask
+        self.teacher_masks[(teacher, day)] = self.teacher_masks.get((teacher, day), 0) | mask
+
+    def unassign(self, teacher, year, day, mask):
+        self._invalidate(teacher, year, day)
+        self.year_masks[(year, day)] = self.year_masks.get((year, day), 0) & ~mask
+        self.teacher_masks[(teacher, day)] = self.teacher_masks.get((teacher, day), 0) & ~mask
+
+    def year_mask(self, year, day):
+        return self.year_masks.get((year, day), 0)
+
+    def teacher_mask(self, teacher, day):
+        return self.teacher_masks.get((teacher, day), 0)
+
+    # Course-level API: sections and rooms resolved through the index
+    def fits(self, course, day, mask, room=None):
+        """True when ``course`` can take ``mask`` on ``day`` (in ``room``, if given)"""
+        if self.blocked_mask(course, day) & mask:
+            return False
+        return room is None or not (self.room_masks.get((room, day), 0) & mask)
+
+    def find_place(self, course, day, mask):
+        """Return ``(True, room)`` for the first room that fits, else ``(False, None)``.
+
+        ``room`` is None when rooms are not in use.
+        """
+        if not self.fits(course, day, mask):
+            return False, None
+        for room in self.index.rooms_for(course):
+            if room is None or not (self.room_masks.get((room, day), 0) & mask):
+                return True, room
+        return False, None
+
+    def blocker(self, course, day, mask):
+        """What keeps ``course`` out of ``mask`` on ``day``: 'teacher', 'group',
+        'room' or None when it fits"""
+        if self.teacher_masks.get((course["teacher"], day), 0) & mask:
+            return "teacher"
+        for group in self.index.checks(course):
+            if self.year_masks.get((group, day), 0) & mask:
+                return "group"
+        for room in self.index.rooms_for(course):
+            if room is None or not (self.room_masks.get((room, day), 0) & mask):
+                return None
+        return "room"
+
+    def first_fit(self, course, day, windows):
+        """First ``(slots, mask)`` of ``windows`` that ``course`` can take on ``day``.
+
+        Returns ``(slots, room)``, or ``(None, None)`` if none fits. The blocked
+        mask is looked up once for the whole day instead of once per window.
+        """
+        blocked = self.blocked_mask(course, day)
+        rooms = self.index.rooms_for(course)
+        for slots, mask in windows:
+            if blocked & mask:
+                continue
+            for room in rooms:
+                if room is None or not (self.room_masks.get((room, day), 0) & mask):
+                    return slots, room
+        return None, None
+
+    def take(self, course, day, mask, room=None):
+        self.assign(course["teacher"], group_of(course), day, mask)
+        if room is not None:
+            self.room_masks[(room, day)] = self.room_masks.get((room, day), 0) | mask
+
+    def release(self, course, day, mask, room=None):
+        self.unassign(course["teacher"], group_of(course), day, mask)
+        if room is not None:
+            self.room_masks[(room, day)] = self.room_masks.get((room, day), 0) & ~mask
+
+    def block_teachers(self, busy):
+        """Mark ``{(teacher, day): mask}`` as taken, e.g. slots a teacher already
+        teaches in another department"""
+        for key, mask in busy.items():
+            for cached in self._by_teacher.pop(key, ()):
+                self._blocked.pop(cached, None)
+            self.teacher_masks[key] = self.teacher_masks.get(key, 0) | mask
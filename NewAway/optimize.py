@@ -0,0 +1,254 @@
+"""Simulated-annealing post-pass over a solved routine.
+
+Hard constraints stay satisfied throughout: every move is checked against
+the occupancy bitmasks before it is applied. The soft cost is a weighted sum
+of per-(teacher, day), per-(group, day) and per-course terms, so a move only
+re-evaluates the handful of terms it touches (delta evaluation).
+"""
+import math
+import random
+import time
+
+import scheduler
+import timegrid
+from occupancy import Occupancy, window_mask
+from resources import ResourceIndex, group_of
+from scoring import idle_gaps
+
+WEIGHTS = {
+    "unplaced": 1000,  # per missing session
+    "preference": 3,  # per slot outside the teacher's preferred span
+    "teacher_gap": 2,  # per idle slot inside a teacher's day
+    "student_gap": 2,  # per idle slot inside a student group's day
+    "spread": 1,  # per pair of a course's lectures on adjacent days
+    "late_lab": 2,  # per lab that runs into the last open slot of its day
+}
+
+
+class Optimizer:
+    def __init__(self, courses, pref_index, routine, weights=None, seed=None, rooms=None, grid=None):
+        self.courses = {c["code"]: c for c in courses}
+        self.grid = grid or timegrid.DEFAULT
+        self.index = ResourceIndex(courses, rooms)
+        self.pref_index = pref_index
+        self.weights = dict(WEIGHTS, **(weights or {}))
+        self.rng = random.Random(seed)
+        self._load(scheduler.routine_placements(routine, courses))
+        # Highest open slot of each day
+        self.last_slot_bits = {day: 1 << (mask.bit_length() - 1) if mask else 0
+                               for day, mask in self.grid.open_masks.items()}
+
+    def _load(self, placements):
+        self.placements = placements
+        self.occupancy = Occupancy(self.index)
+        for code, placed in placements.items():
+            course = self.courses[code]
+            for day, slots, room in placed:
+                self.occupancy.take(course, day, window_mask(slots), room)
+
+    # Cost terms
+    def teacher_term(self, teacher, day):
+        return self.weights["teacher_gap"] * idle_gaps(self.occupancy.teacher_mask(teacher, day),
+                                                       self.grid.break_masks[day])
+
+    def group_term(self, group, day):
+        return self.weights["student_gap"] * idle_gaps(self.occupancy.year_mask(group, day),
+                                                       self.grid.break_masks[day])
+
+    def course_term(self, code):
+        course = self.courses[code]
+        placed = self.placements[code]
+        prefs = self.pref_index.get(course["teacher"])
+        cost = self.weights["unplaced"] * max(0, scheduler.required_sessions(course) - len(placed))
+        for day, slots, _ in placed:
+            mask = window_mask(slots)
+            if prefs:
+                cost += self.weights["preference"] * bin(mask & ~prefs.get(day, 0)).count("1")
+            if scheduler.is_even_course(code) and mask & self.last_slot_bits[day]:
+                cost += self.weights["late_lab"]
+        if len(placed) > 1:
+            days = sorted(self.grid.days.index(p[0]) for p in placed)
+            cost += self.weights["spread"] * sum(1 for a, b in zip(days, days[1:]) if b - a == 1)
+        return cost
+
+    def cost(self):
+        teachers = {c["teacher"] for c in self.courses.values()}
+        groups = {group_of(c) for c in self.courses.values()}
+        return (sum(self.teacher_term(t, d) for t in teachers for d in self.grid.days)
+                + sum(self.group_term(g, d) for g in groups for d in self.grid.days)
+                + sum(self.course_term(code) for code in self.courses))
+
+    def local_cost(self, codes, days):
+        """Sum of the terms a move over ``codes`` on ``days`` can change"""
+        teachers = {self.courses[code]["teacher"] for code in codes}
+        groups = {group_of(self.courses[code]) for code in codes}
+        return (sum(self.teacher_term(t, d) for t in teachers for d in days)
+                + sum(self.group_term(g, d) for g in groups for d in days)
+                + sum(self.course_term(code) for code in codes))
+
+    # Placement primitives
+    def _assign(self, code, day, slots, room):
+        self.occupancy.take(self.courses[code], day, window_mask(slots), room)
+        self.placements[code].append((day, slots, room))
+
+    def _unassign(self, code, index):
+        day, slots, room = self.placements[code].pop(index)
+        self.occupancy.release(self.courses[code], day, window_mask(slots), room)
+        return day, slots, room
+
+    def _fits(self, code, day, slots):
+        """``(True, room)`` when ``code`` can take ``slots`` on ``day``"""
+        if not scheduler.is_even_course(code) and any(p[0] == day for p in self.placements[code]):
+            return False, None  # one lecture per day
+        return self.occupancy.find_place(self.courses[code], day, window_mask(slots))
+
+    def _random_value(self, code):
+        """A random (day, slots) for ``code``, drawn from preferred spans half the
+        time; None when the chosen day has no window for it"""
+        prefs = self.pref_index.get(self.courses[code]["teacher"])
+        even = scheduler.is_even_course(code)
+        if prefs and self.rng.random() < 0.5:
+            day = self.rng.choice(list(prefs))
+            windows = [w for w, m in self.grid.windows(day, even) if m & prefs[day] == m]
+            if windows:
+                return day, list(self.rng.choice(windows))
+        day = self.rng.choice(self.grid.days)
+        windows = self.grid.windows(day, even)
+        if not windows:
+            return None
+        return day, list(self.rng.choice(windows)[0])
+
+    # Moves; each returns (delta, undo) or None when infeasible
+    def _move(self):
+        code = self.rng.choice(self.codes)
+        placed = self.placements[code]
+        if len(placed) < scheduler.required_sessions(self.courses[code]) and (
+                not placed or self.rng.random() < 0.5):
+            # Try to fit a missing session
+            value = self._random_value(code)
+            if value is None:
+                return None
+            day, slots = value
+            ok, room = self._fits(code, day, slots)
+            if not ok:
+                return None
+            before = self.local_cost([code], [day])
+            self._assign(code, day, slots, room)
+            return self.local_cost([code], [day]) - before, lambda: self._unassign(code, -1)
+        if not placed:
+            return None
+        index = self.rng.randrange(len(placed))
+        value = self._random_value(code)
+        if value is None:
+            return None
+        new_day, new_slots = value
+        old = placed[index]
+        days = {old[0], new_day}
+        before = self.local_cost([code], days)
+        self._unassign(code, index)
+        ok, room = self._fits(code, new_day, new_slots)
+        if not ok:
+            self._assign(code, *old)
+            return None
+        self._assign(code, new_day, new_slots, room)
+
+        def undo():
+            self._unassign(code, -1)
+            self._assign(code, *old)
+        return self.local_cost([code], days) - before, undo
+
+    def _swap(self):
+        """Exchange the times of two same-length sessions of one student group"""
+        a = self.rng.choice(self.codes)
+        if not self.placements[a]:
+            return None
+        candidates = self.by_group[(group_of(self.courses[a]), scheduler.is_even_course(a))]
+        b = self.rng.choice(candidates)
+        if b == a or not self.placements[b]:
+            return None
+        ia = self.rng.randrange(len(self.placements[a]))
+        ib = self.rng.randrange(len(self.placements[b]))
+        old_a = self.placements[a][ia]
+        old_b = self.placements[b][ib]
+        days = {old_a[0], old_b[0]}
+        before = self.local_cost([a, b], days)
+        self._unassign(a, ia)
+        self._unassign(b, ib)
+        ok, room = self._fits(a, old_b[0], old_b[1])
+        if ok:
+            self._assign(a, old_b[0], old_b[1], room)
+            ok, room = self._fits(b, old_a[0], old_a[1])
+            if ok:
+                self._assign(b, old_a[0], old_a[1], room)
+
+                def undo():
+                    self._unassign(b, -1)
+                    self._unassign(a, -1)
+                    self._assign(a, *old_a)
+                    self._assign(b, *old_b)
+                return self.local_cost([a, b], days) - before, undo
+            self._unassign(a, -1)
+        self._assign(a, *old_a)
+        self._assign(b, *old_b)
+        return None
+
+    def run(self, time_limit=2.0, max_iterations=200000, initial_temperature=5.0, cooling=0.9995):
+        """Anneal and leave the best placements found in ``self.placements``"""
+        self.codes = list(self.courses)
+        self.by_group = {}
+        for code, course in self.courses.items():
+            key = (group_of(course), scheduler.is_even_course(code))
+            self.by_group.setdefault(key, []).append(code)
+
+        current = best = self.cost()
+        initial = current
+        best_placements = {code: list(p) for code, p in self.placements.items()}
+        temperature = initial_temperature
+        deadline = time.perf_counter() + time_limit if time_limit else None
+        iterations = accepted = 0
+
+        while self.codes and iterations < max_iterations:
+            if deadline and iterations % 256 == 0 and time.perf_counter() > deadline:
+                break
+            iterations += 1
+            result = self._move() if self.rng.random() < 0.6 else self._swap()
+            if result is not None:
+                delta, undo = result
+                if delta <= 0 or self.rng.random() < math.exp(-delta / max(temperature, 1e-9)):
+                    current += delta
+                    accepted += 1
+                    if current < best:
+                        best = current
+                        best_placements = {code: list(p) for code, p in self.placements.items()}
+                else:
+                    undo()
+            temperature *= cooling
+
+        self._load(best_placements)
+        return {"initial_cost": initial, "final_cost": best,
+                "iterations": iterations, "accepted": accepted}
+
+
+def optimize(routine, courses, teacher_priorities, teachers=(), time_limit=2.0, seed=None,
+             pref_index=None, weights=None, rooms=None, grid=None):
+    """Improve a routine's soft cost; returns ``(routine, diagnostics)`` where the
+    diagnostics describe the placements after optimisation"""
+    if pref_index is None:
+        pref_index, _ = scheduler.compile_preferences(teacher_priorities, grid)
+    optimizer = Optimizer(courses, pref_index, routine, weights, seed, rooms, grid)
+    stats = optimizer.run(time_limit)
+
+    teacher_short_names = scheduler.generate_teacher_short_names(
+        list(teachers) + [c["teacher"] for c in courses])
+    result = scheduler.empty_routine(optimizer.index, optimizer.grid)
+    occupancy = Occupancy(optimizer.index)
+    diagnostics = {"unplaced": [], "warnings": [], "optimizer": stats}
+    for code, placed in optimizer.placements.items():
+        course = optimizer.courses[code]
+        for day, slots, room in placed:
+            scheduler.place(result, occupancy, course, day, slots, teacher_short_names[course["teacher"]],
+                            room)
+        required = scheduler.required_sessions(course)
+        if len(placed) < required:
+            diagnostics["unplaced"].append({"code": code, "assigned": len(placed), "required": required})
+    return result, diagnostics
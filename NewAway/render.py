@@ -0,0 +1,201 @@
+"""PDF output for solved routines.
+
+The department table is emitted page by page instead of as one big table
+that ReportLab would have to split: row heights are measured once per line
+count and the rows are cut into pages that fit the document frame, header
+repeated. Column widths (and the font with them) shrink to the frame width
+when a grid has many slots. All tables share the module-level styles
+below. ``render_all`` writes the department routine plus one PDF per
+teacher and per year from a single pass over the routine. Columns, their
+time labels, breaks and closed slots come from the ``timegrid.TimeGrid``
+passed as ``grid`` (the default week if None).
+"""
+import os
+
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer, PageBreak, Paragraph
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+
+import timegrid
+from scheduler import cell_text, group_name, group_slug, group_sort_key, safe_name
+
+MAIN_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.beige, colors.whitesmoke]),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+])
+
+TEACHER_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.beige, colors.whitesmoke]),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+])
+
+TITLE_STYLE = getSampleStyleSheet()["Heading2"]
+
+PAGE_SIZE = landscape(letter)
+
+
+# SimpleDocTemplate's frame pads its content by 6pt on every side
+FRAME_PADDING = 12
+
+
+def _fit(col_widths, style, font_size, width):
+    """Scale ``col_widths`` down to ``width`` if needed, with the font size
+    scaled alike; returns ``(col_widths, style)``"""
+    scale = min(1.0, width / sum(col_widths))
+    if scale == 1.0:
+        return col_widths, style
+    size = max(5, round(font_size * scale, 1))
+    return [w * scale for w in col_widths], TableStyle([('FONTSIZE', (0, 0), (-1, -1), size)], parent=style)
+
+
+def _pages(header, rows, style, col_widths, height):
+    """Split ``rows`` into pages whose table, header included, fits ``height``.
+
+    A row is as tall as its cell with the most lines, so each line count is
+    measured once on a two-row table rather than wrapping every row.
+    """
+    header_height = Table([header], colWidths=col_widths, style=style).wrap(0, 0)[1]
+    row_heights = {}
+
+    def row_height(row):
+        lines = max(str(cell).count("\n") + 1 for cell in row)
+        if lines not in row_heights:
+            sample = ["\n".join(["x"] * lines)] * len(row)
+            table = Table([header, sample], colWidths=col_widths, style=style)
+            row_heights[lines] = table.wrap(0, 0)[1] - header_height
+        return row_heights[lines]
+
+    page, used = [], header_height
+    for row in rows:
+        h = row_height(row)
+        if page and used + h > height:
+            yield page
+            page, used = [], header_height
+        page.append(row)
+        used += h
+    if page:
+        yield page
+
+
+def _empty_cell(grid, day, slot):
+    if grid.is_break(day, slot):
+        return "Break"
+    return "" if grid.is_open(day, slot) else "-"
+
+
+def _routine_rows(routine, grid):
+    """Rows of the department table, one per (day, group)"""
+    groups = sorted(routine, key=group_sort_key)
+    for day in grid.days:
+        for group in groups:
+            row = [day if group == groups[0] else "", group_name(group)]
+            for s in grid.slots:
+                data = routine[group][day][s]
+                row.append(cell_text(data, "\n") if data else _empty_cell(grid, day, s))
+            yield row
+
+
+def routine_story(routine, teacher_short_names, grid=None, frame_size=None):
+    """The department table and the teacher key for a frame of ``frame_size``
+    ``(width, height)`` points (a landscape letter page if None)"""
+    grid = grid or timegrid.DEFAULT
+    width, height = frame_size or _frame_size(_doc(None))
+    header = ["Day", "Year"] + [grid.label(s) for s in grid.slots]
+    col_widths, style = _fit([70, 90] + [80] * len(grid.slots), MAIN_STYLE, 9, width)
+    day = None
+    for number, page in enumerate(_pages(header, _routine_rows(routine, grid), style, col_widths, height)):
+        # The day is repeated on the first row of every page so split days stay readable
+        page[0][0] = page[0][0] or day
+        day = next(row[0] for row in reversed(page) if row[0])
+        if number:
+            yield PageBreak()
+        yield Table([header] + page, colWidths=col_widths, style=style, repeatRows=1)
+    yield Spacer(1, 20)
+
+    # Teacher reference table; short enough for ReportLab to split as it goes
+    teacher_rows = [[short_name, teacher] for teacher, short_name in teacher_short_names.items()]
+    yield Table([["Short Name", "Full Name"]] + teacher_rows, colWidths=[150, 300], style=TEACHER_STYLE,
+                repeatRows=1)
+
+
+def grid_story(title, cells, grid=None, frame_size=None):
+    """A single day x slot table for one teacher or one year; ``cells`` maps
+    ``(day, slot)`` to the cell text"""
+    grid = grid or timegrid.DEFAULT
+    width, _ = frame_size or _frame_size(_doc(None))
+    col_widths, style = _fit([90] + [80] * len(grid.slots), MAIN_STYLE, 9, width)
+    header = ["Day"] + [grid.label(s) for s in grid.slots]
+    rows = []
+    for day in grid.days:
+        row = [day]
+        for s in grid.slots:
+            row.append(cells[(day, s)] if (day, s) in cells else _empty_cell(grid, day, s))
+        rows.append(row)
+    yield Paragraph(title, TITLE_STYLE)
+    yield Table([header] + rows, colWidths=col_widths, style=style, repeatRows=1)
+
+
+def _doc(filename):
+    return SimpleDocTemplate(filename, pagesize=PAGE_SIZE)
+
+
+def _frame_size(doc):
+    """Room a flowable gets inside the page frame of ``doc``"""
+    return doc.width - FRAME_PADDING, doc.height - FRAME_PADDING
+
+
+def build_pdf(filename, story):
+    _doc(filename).build(list(story))
+    return filename
+
+
+def create_pdf(routine, teacher_short_names, filename="routine_final.pdf", grid=None):
+    doc = _doc(filename)
+    doc.build(list(routine_story(routine, teacher_short_names, grid, _frame_size(doc))))
+    return filename
+
+
+def render_all(routine, courses, teacher_short_names, out_dir, filename="routine_final.pdf",
+               per_teacher=True, per_year=True, grid=None):
+    """Write the department PDF plus per-teacher and per-year PDFs into ``out_dir``.
+
+    The routine is walked once to bucket every cell by teacher and by year.
+    Returns the list of files written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    teacher_of = {c["code"]: c["teacher"] for c in courses}
+    by_teacher = {}
+    by_year = {}
+    for group, days in routine.items():
+        for day, slots in days.items():
+            for s, data in slots.items():
+                if not data:
+                    continue
+                by_year.setdefault(group, {})[(day, s)] = cell_text(data, "\n")
+                teacher = teacher_of.get(data[0])
+                if teacher:
+                    by_teacher.setdefault(teacher, {})[(day, s)] = f"{data[0]}\n({group_name(group)})"
+
+    written = [create_pdf(routine, teacher_short_names, os.path.join(out_dir, filename), grid=grid)]
+    if per_teacher:
+        for teacher, cells in by_teacher.items():
+            path = os.path.join(out_dir, f"teacher_{safe_name(teacher)}.pdf")
+            written.append(build_pdf(path, grid_story(teacher, cells, grid)))
+    if per_year:
+        for group, cells in sorted(by_year.items(), key=lambda item: group_sort_key(item[0])):
+            path = os.path.join(out_dir, f"year_{group_slug(group)}.pdf")
+            written.append(build_pdf(path, grid_story(group_name(group), cells, grid)))
+    return written
@@ -0,0 +1,120 @@
+"""Rooms, sections and the course conflict index.
+
+Student groups: a course with a ``"section"`` belongs to group
+``(year, section)``; one without belongs to the whole ``year``. A year-wide
+course clashes with every section of its year, and a section course clashes
+with its own section and the year-wide courses, but not with other sections.
+Courses are identified by code alone, so every section needs its own code
+(``CSE 1201A`` and ``CSE 1201B``, not ``CSE 1201`` twice);
+``section_code_error`` reports a course that breaks the rule.
+
+Rooms come from ``rooms.txt`` (``name,type`` per line). A course may occupy any
+room whose type matches its ``"room_type"`` (``lab`` for even codes, ``theory``
+otherwise) or, if it lists ``"rooms"``, only those rooms. With no rooms
+configured the room constraint is switched off.
+
+``ResourceIndex.neighbours`` lists the courses that can ever clash with a
+course (shared teacher, overlapping student group or a shared candidate
+room), so feasibility and propagation only visit those instead of the whole
+catalogue.
+"""
+import os
+
+
+def load_rooms(path):
+    rooms = {}
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            for line in file:
+                parts = [p.strip() for p in line.split(",")]
+                if len(parts) >= 2 and parts[0]:
+                    rooms[parts[0]] = parts[1]
+                elif line.strip():
+                    print(f"Skipping invalid line: {line.strip()}")
+    return rooms
+
+
+def is_even_course(code):
+    """Even course numbers are labs"""
+    numeric_part = ''.join(filter(str.isdigit, code))
+    return int(numeric_part) % 2 == 0 if numeric_part else False
+
+
+def group_of(course):
+    section = course.get("section")
+    return (course["year"], section) if section else course["year"]
+
+
+def section_code_error(existing, course):
+    """Why ``course`` may not take ``existing``'s code, or None if it only
+    updates the same course"""
+    if existing.get("section", "") == course.get("section", ""):
+        return None
+    taken_by = f"section {existing['section']}" if existing.get("section") else "the whole year"
+    return (f"course code {course['code']} is already used by {taken_by}; "
+            f"each section needs its own code (e.g. {course['code']}{course.get('section', '')})")
+
+
+def room_type_of(course):
+    return course.get("room_type") or ("lab" if is_even_course(course["code"]) else "theory")
+
+
+class ResourceIndex:
+    def __init__(self, courses=(), rooms=None):
+        self.rooms = dict(rooms or {})
+        self.sections = {}  # year -> set of section groups
+        self.by_teacher = {}
+        self.by_group = {}
+        self.by_room = {}
+        self.rooms_by_type = {}
+        self.version = 0  # bumped when a new section changes what a year must check
+        for name, kind in self.rooms.items():
+            self.rooms_by_type.setdefault(kind, []).append(name)
+        for course in courses:
+            self.add(course)
+
+    def add(self, course):
+        group = group_of(course)
+        if isinstance(group, tuple) and group not in self.sections.get(course["year"], ()):
+            self.sections.setdefault(course["year"], set()).add(group)
+            self.version += 1
+        self.by_teacher.setdefault(course["teacher"], {})[course["code"]] = course
+        self.by_group.setdefault(group, {})[course["code"]] = course
+        for room in self.rooms_for(course):
+            if room is not None:
+                self.by_room.setdefault(room, {})[course["code"]] = course
+
+    def remove(self, course):
+        self.by_teacher.get(course["teacher"], {}).pop(course["code"], None)
+        self.by_group.get(group_of(course), {}).pop(course["code"], None)
+        for room in self.rooms_for(course):
+            self.by_room.get(room, {}).pop(course["code"], None)
+
+    def groups(self):
+        """Every student group, for laying out an empty routine"""
+        return set(self.by_group)
+
+    def checks(self, course):
+        """Groups whose occupancy ``course`` must not overlap"""
+        group = group_of(course)
+        if isinstance(group, tuple):
+            return (group, course["year"])
+        return (group,) + tuple(self.sections.get(group, ()))
+
+    def rooms_for(self, course):
+        """Candidate rooms, or ``[None]`` when rooms are not in use"""
+        if not self.rooms:
+            return [None]
+        if course.get("rooms"):
+            return [r for r in course["rooms"] if r in self.rooms]
+        return self.rooms_by_type.get(room_type_of(course), [])
+
+    def neighbours(self, course):
+        """Courses (other than ``course``) that could ever clash with it"""
+        found = dict(self.by_teacher.get(course["teacher"], {}))
+        for group in self.checks(course):
+            found.update(self.by_group.get(group, {}))
+        for room in self.rooms_for(course):
+            found.update(self.by_room.get(room, {}))
+        found.pop(course["code"], None)
+        return list(found.values())
@@ -0,0 +1,91 @@
+"""Schedule Info grid: a Treeview over the routine, filled lazily.
+
+Rows come straight from ``scheduler.schedule_rows`` (one per day and group,
+one column per slot of the time grid). Only the first ``CHUNK`` rows are
+inserted; more are appended as the list is scrolled near its end, so large
+routines show up at once. The year, teacher and day filters rebuild the row
+iterator.
+"""
+import itertools
+import tkinter as tk
+from tkinter import ttk
+
+import scheduler
+import timegrid
+
+ALL = "All"
+CHUNK = 100
+
+
+class ScheduleView(ttk.Frame):
+    def __init__(self, parent, grid=None):
+        super().__init__(parent)
+        # Not self.grid: that would shadow the Tk geometry manager
+        self.time_grid = grid or timegrid.DEFAULT
+        self.routine = {}
+        self.teacher_of = {}
+        self.groups = {}  # display name -> group
+        self.rows = iter(())
+
+        filters = ttk.Frame(self)
+        filters.pack(fill='x', pady=(0, 5))
+        self.group_var = tk.StringVar(value=ALL)
+        self.teacher_var = tk.StringVar(value=ALL)
+        self.day_var = tk.StringVar(value=ALL)
+        self.group_combo = self._add_filter(filters, "Year:", self.group_var, 14)
+        self.teacher_combo = self._add_filter(filters, "Teacher:", self.teacher_var, 30)
+        self.day_combo = self._add_filter(filters, "Day:", self.day_var, 12)
+        self.day_combo["values"] = [ALL] + self.time_grid.days
+
+        columns = ["day", "group"] + [f"slot{s}" for s in self.time_grid.slots]
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=20)
+        self.tree.heading("day", text="Day")
+        self.tree.heading("group", text="Year")
+        self.tree.column("day", width=90, stretch=False)
+        self.tree.column("group", width=110, stretch=False)
+        for s in self.time_grid.slots:
+            self.tree.heading(f"slot{s}", text=self.time_grid.label(s))
+            self.tree.column(f"slot{s}", width=120)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+
+    def _add_filter(self, parent, label, variable, width):
+        ttk.Label(parent, text=label).pack(side='left', padx=(0, 5))
+        combo = ttk.Combobox(parent, textvariable=variable, state="readonly", width=width, values=[ALL])
+        combo.pack(side='left', padx=(0, 15))
+        combo.bind("<<ComboboxSelected>>", self.refresh)
+        return combo
+
+    def show(self, routine, courses):
+        """Display ``routine``; ``courses`` supply the teacher of each code"""
+        self.routine = routine
+        self.teacher_of = {c["code"]: c["teacher"] for c in courses}
+        self.groups = {scheduler.group_name(g): g for g in sorted(routine, key=scheduler.group_sort_key)}
+        self.group_combo["values"] = [ALL] + list(self.groups)
+        self.teacher_combo["values"] = [ALL] + sorted(set(self.teacher_of.values()))
+        for variable, combo in ((self.group_var, self.group_combo), (self.teacher_var, self.teacher_combo)):
+            if variable.get() not in combo["values"]:
+                variable.set(ALL)
+        self.refresh()
+
+    def refresh(self, event=None):
+        self.tree.delete(*self.tree.get_children())
+        group = self.groups.get(self.group_var.get())
+        teacher = self.teacher_var.get()
+        day = self.day_var.get()
+        self.rows = scheduler.schedule_rows(self.routine, self.teacher_of, group,
+                                            None if teacher == ALL else teacher,
+                                            None if day == ALL else day, self.time_grid)
+        self._load_more()
+
+    def _load_more(self):
+        for day, group, cells in itertools.islice(self.rows, CHUNK):
+            self.tree.insert("", "end", values=[day, scheduler.group_name(group)] + cells)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9:
+            # Near the bottom (or everything fits): add the next chunk, if any
+            self._load_more()
@@ -0,0 +1,368 @@
+import json
+import os
+
+import instrument
+import storage
+import timegrid
+from occupancy import Occupancy, window_mask
+from resources import ResourceIndex, group_of, is_even_course
+
+YEARS = [1, 2, 3, 4]
+
+
+# Data Loading/Saving Functions
+def load_teachers(path):
+    return list(load_teacher_departments(path))
+
+
+def load_teacher_departments(path):
+    """Map each teacher to their department ('' if none was recorded).
+
+    Lines are ``name`` or ``name,department``; a later line for the same
+    teacher wins, so appending a line updates the department.
+    """
+    departments = {}
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            for line in file:
+                name, _, department = line.strip().partition(",")
+                if name.strip():
+                    departments[name.strip()] = department.strip()
+    return departments
+
+
+def format_teacher_line(teacher, department=""):
+    return f"{teacher},{department}\n" if department else f"{teacher}\n"
+
+
+def load_teacher_priorities(path):
+    if os.path.exists(path):
+        priorities = {}
+        with open(path, "r") as file:
+            for line in file.readlines():
+                try:
+                    parts = line.strip().split(",")
+                    if len(parts) >= 3:
+                        teacher = parts[0].strip()
+                        priority = int(parts[1].strip())
+                        slots = [s.strip().strip("'") for s in parts[2:]]
+                        priorities[teacher] = {"priority": priority, "slots": slots}
+                except (ValueError, IndexError) as e:
+                    print(f"Skipping invalid line: {line.strip()} (Error: {e})")
+        return priorities
+    return {}
+
+
+def format_priority_line(teacher, data):
+    return f"{teacher},{data['priority']}," + ",".join(f"'{s}'" for s in data["slots"]) + "\n"
+
+
+def save_teacher_priorities(path, teacher_priorities):
+    storage.atomic_write(path, (format_priority_line(t, d) for t, d in teacher_priorities.items()))
+
+
+def append_teacher_priority(path, teacher, data):
+    """Add one teacher's line; on load a later line for the same teacher wins"""
+    storage.append_lines(path, [format_priority_line(teacher, data)])
+
+
+def save_teachers(path, teachers, departments=None):
+    departments = departments or {}
+    storage.atomic_write(path, (format_teacher_line(t, departments.get(t, "")) for t in teachers))
+
+
+def append_teacher(path, teacher, department=""):
+    storage.append_lines(path, [format_teacher_line(teacher, department)])
+
+
+def load_courses(path):
+    return storage.read_courses(path)
+
+
+def save_courses(path, courses):
+    storage.atomic_write(path, (f"{json.dumps(course)}\n" for course in courses))
+
+
+# Scheduling
+def solve(courses, teacher_priorities, teachers=(), pref_index=None, keep_order=False, rooms=None,
+          profile=None, busy=None, grid=None):
+    """Build a routine for the given courses without touching any GUI.
+
+    Returns ``(routine, diagnostics)`` where ``routine[group][day][slot]`` is
+    either None or a ``(code, teacher_short_name)`` tuple (with a third room
+    element when ``rooms`` are given) and ``diagnostics`` lists the courses
+    that could not be fully placed. A group is a year or ``(year, section)``.
+    ``pref_index`` is the output of ``compile_preferences``; it is built here
+    when not given. With ``keep_order`` the courses are placed in the order
+    given instead of by teacher priority. An ``instrument.Profile`` passed as
+    ``profile`` records pass timings, fit calls and why courses were dropped.
+    ``busy`` maps ``(teacher, day)`` to slots the teacher is already taken
+    (e.g. by another department) and must not be used. ``grid`` is the
+    ``timegrid.TimeGrid`` to schedule on (the default week if None).
+    """
+    grid = grid or timegrid.DEFAULT
+    diagnostics = {"unplaced": [], "warnings": []}
+    if pref_index is None:
+        pref_index, errors = compile_preferences(teacher_priorities, grid)
+        diagnostics["warnings"].extend(errors)
+
+    index = ResourceIndex(courses, rooms)
+    occupancy = Occupancy(index) if profile is None else profile.occupancy(index)
+    if busy:
+        occupancy.block_teachers(busy)
+    routine = empty_routine(occupancy.index, grid)
+    teacher_short_names = generate_teacher_short_names(
+        list(teachers) + [c["teacher"] for c in courses])
+
+    # Sort by priorities
+    if not keep_order:
+        rank = teacher_rank(teacher_priorities)
+        courses = sorted(courses, key=lambda c: rank.get(c["teacher"], float("inf")))
+
+    with instrument.phase(profile, "even_pass"):
+        process_even_courses(courses, pref_index, routine, occupancy,
+                             teacher_short_names, diagnostics, grid)
+    with instrument.phase(profile, "odd_pass"):
+        process_odd_courses(courses, pref_index, routine, occupancy,
+                            teacher_short_names, diagnostics, grid)
+    if profile is not None:
+        profile.record_cache(occupancy)
+        by_code = {c["code"]: c for c in courses}
+        for item in diagnostics["unplaced"]:
+            profile.record_unplaced(by_code[item["code"]], item["assigned"], item["required"])
+    return routine, diagnostics
+
+
+def teacher_rank(teacher_priorities):
+    """Map each teacher to their position when sorted by priority"""
+    sorted_teachers = sorted(teacher_priorities.items(),
+                             key=lambda x: x[1]["priority"])
+    return {teacher: idx for idx, (teacher, _) in enumerate(sorted_teachers)}
+
+
+def empty_routine(index=None, grid=None):
+    grid = grid or timegrid.DEFAULT
+    groups = set(YEARS) | (index.groups() if index else set())
+    return {group: {day: {slot: None for slot in grid.slots} for day in grid.days}
+            for group in sorted(groups, key=group_sort_key)}
+
+
+def group_sort_key(group):
+    return group if isinstance(group, tuple) else (group, "")
+
+
+def year_name(year):
+    suffix = "th" if 10 <= year % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(year % 10, "th")
+    return f"{year}{suffix} Year"
+
+
+def group_name(group):
+    if isinstance(group, tuple):
+        return f"{year_name(group[0])} ({group[1]})"
+    return year_name(group)
+
+
+def safe_name(text):
+    return "".join(ch if ch.isalnum() else "_" for ch in text).strip("_")
+
+
+def group_slug(group):
+    """File-name part for a group: '1', '1_A' ..."""
+    return safe_name("_".join(str(part) for part in group) if isinstance(group, tuple) else str(group))
+
+
+def required_sessions(course):
+    """Labs need one 3-slot window, theory courses one slot per credit"""
+    return 1 if is_even_course(course["code"]) else int(course["credit"])
+
+
+def missing_sessions(diagnostics):
+    """Total number of sessions the solver failed to place"""
+    return sum(item["required"] - item["assigned"] for item in diagnostics["unplaced"])
+
+
+def routine_placements(routine, courses):
+    """Recover ``{code: [(day, slots, room)]}`` from a routine, one entry per day used"""
+    placements = {c["code"]: [] for c in courses}
+    for days in routine.values():
+        for day, slots in days.items():
+            by_code = {}
+            for slot, data in slots.items():
+                if data and data[0] in placements:
+                    room = data[2] if len(data) > 2 else None
+                    by_code.setdefault((data[0], room), []).append(slot)
+            for (code, room), placed in by_code.items():
+                placements[code].append((day, placed, room))
+    return placements
+
+
+def place(routine, occupancy, course, day, slots, label, room=None):
+    """Write ``course`` into ``slots`` of ``day`` and mark them occupied"""
+    group = group_of(course)
+    if group not in routine:
+        # Same days and slots as the groups already there
+        template = next(iter(routine.values()))
+        routine[group] = {d: dict.fromkeys(slots) for d, slots in template.items()}
+    occupancy.take(course, day, window_mask(slots), room)
+    cell = (course["code"], label) if room is None else (course["code"], label, room)
+    for s in slots:
+        routine[group][day][s] = cell
+
+
+def unplace(routine, occupancy, course, day, slots, room=None):
+    """Undo a previous ``place`` call"""
+    occupancy.release(course, day, window_mask(slots), room)
+    for s in slots:
+        routine[group_of(course)][day][s] = None
+
+
+def process_even_courses(courses, pref_index, routine, occupancy,
+                         teacher_short_names, diagnostics, grid=None):
+    """Greedy pass for even courses: assign one lab window of the grid
+    (consecutive open slots, no break slot)"""
+    grid = grid or timegrid.DEFAULT
+    even_courses = [c for c in courses if is_even_course(c["code"])]
+    for course in even_courses:
+        assigned = False
+        teacher = course["teacher"]
+        code = course["code"]
+        label = teacher_short_names[teacher]
+
+        # Try teacher's preferences first: every lab window inside a preferred span
+        for day, pref_mask in pref_index.get(teacher, {}).items():
+            windows = [(w, m) for w, m in grid.lab_windows[day] if m & pref_mask == m]
+            window, room = occupancy.first_fit(course, day, windows)
+            if window:
+                place(routine, occupancy, course, day, window, label, room)
+                assigned = True
+                break
+
+        # If not assigned, try all possible days and slots
+        if not assigned:
+            for day in grid.days:
+                window, room = occupancy.first_fit(course, day, grid.lab_windows[day])
+                if window:
+                    place(routine, occupancy, course, day, window, label, room)
+                    assigned = True
+                    break
+        if not assigned:
+            diagnostics["unplaced"].append({"code": code, "assigned": 0, "required": 1})
+
+
+def process_odd_courses(courses, pref_index, routine, occupancy,
+                        teacher_short_names, diagnostics, grid=None):
+    """Assign odd courses: one lecture window per day, split across days"""
+    grid = grid or timegrid.DEFAULT
+    odd_courses = [c for c in courses if not is_even_course(c["code"])]
+    for course in odd_courses:
+        teacher = course["teacher"]
+        code = course["code"]
+        label = teacher_short_names[teacher]
+        credit = int(course["credit"])
+        assigned_slots = 0
+        used_days = set()
+
+        # Try teacher's preferences first
+        for day, pref_mask in pref_index.get(teacher, {}).items():
+            if assigned_slots >= credit:
+                break
+            if day in used_days:
+                continue  # don't assign more than one slot per day for this course
+            windows = [(w, m) for w, m in grid.lecture_windows[day] if m & pref_mask == m]
+            slots, room = occupancy.first_fit(course, day, windows)
+            if slots:
+                place(routine, occupancy, course, day, slots, label, room)
+                assigned_slots += 1
+                used_days.add(day)
+
+        # If not enough slots assigned, try all days/slots
+        if assigned_slots < credit:
+            for day in grid.days:
+                if assigned_slots >= credit:
+                    break
+                if day in used_days:
+                    continue
+                slots, room = occupancy.first_fit(course, day, grid.lecture_windows[day])
+                if slots:
+                    place(routine, occupancy, course, day, slots, label, room)
+                    assigned_slots += 1
+                    used_days.add(day)
+        if assigned_slots < credit:
+            diagnostics["unplaced"].append({"code": code, "assigned": assigned_slots, "required": credit})
+
+
+# Helper Functions
+def generate_teacher_short_names(teachers):
+    return {teacher: ''.join([name[0].upper() for name in teacher.split()])
+            for teacher in teachers}
+
+
+def compile_preferences(teacher_priorities, grid=None):
+    """Compile the preference strings once into ``{teacher: {day: slot mask}}``.
+
+    Days keep the order in which they were first listed and repeated days are
+    merged. Times are read against ``grid`` (the default week if None).
+    Returns ``(index, errors)`` with one message per malformed entry.
+    """
+    grid = grid or timegrid.DEFAULT
+    index = {}
+    errors = []
+    for teacher, data in teacher_priorities.items():
+        days = index.setdefault(teacher, {})
+        for pref in data["slots"]:
+            try:
+                day, mask = grid.parse_preference(pref)
+            except ValueError as e:
+                errors.append(f"{teacher}: '{pref}' ({e})")
+                continue
+            days[day] = days.get(day, 0) | mask
+    return index, errors
+
+
+def cell_text(data, sep=" "):
+    """``code (teacher)`` plus the room, if any, for one routine cell"""
+    text = f"{data[0]}{sep}({data[1]})"
+    return f"{text}{sep}{data[2]}" if len(data) > 2 else text
+
+
+def schedule_rows(routine, teacher_of=None, group=None, teacher=None, day=None, grid=None):
+    """Yield ``(day, group, cells)`` for the routine grid, one row per (day, group).
+
+    ``cells`` holds one text per slot ('' when free). Each filter that is not
+    None keeps only that group, day or teacher; filtering by teacher needs
+    ``teacher_of`` (code -> teacher), blanks other teachers' cells and skips
+    rows left empty. Rows are produced lazily, straight from the routine.
+    """
+    grid = grid or timegrid.DEFAULT
+    groups = [group] if group is not None else sorted(routine, key=group_sort_key)
+    for d in [day] if day is not None else grid.days:
+        for g in groups:
+            slots = routine.get(g, {}).get(d)
+            if slots is None:
+                continue
+            cells = []
+            for s in grid.slots:
+                data = slots[s]
+                if data and (teacher is None or teacher_of.get(data[0]) == teacher):
+                    cells.append(cell_text(data))
+                else:
+                    cells.append("")
+            if teacher is None or any(cells):
+                yield d, g, cells
+
+
+def generate_schedule_text(routine):
+    parts = ["Generated Schedule:\n\n"]
+    for group, days in routine.items():
+        parts.append(f"Year {group[0]} ({group[1]}):\n" if isinstance(group, tuple) else f"Year {group}:\n")
+        for day, slots in days.items():
+            parts.append(f"  {day}:\n")
+            for slot, data in slots.items():
+                if data and len(data) > 2:
+                    parts.append(f"    Slot {slot}: {data[0]} (Teacher: {data[1]}, Room: {data[2]})\n")
+                elif data:
+                    parts.append(f"    Slot {slot}: {data[0]} (Teacher: {data[1]})\n")
+                else:
+                    parts.append(f"    Slot {slot}: Free\n")
+        parts.append("\n")
+    return "".join(parts)
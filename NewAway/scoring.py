@@ -0,0 +1,56 @@
+"""Quality measures for a solved routine, used to compare candidate routines."""
+import scheduler
+import timegrid
+
+
+def teacher_day_masks(routine, courses):
+    """Rebuild ``{(teacher, day): slot mask}`` from a routine"""
+    teacher_of = {c["code"]: c["teacher"] for c in courses}
+    masks = {}
+    for days in routine.values():
+        for day, slots in days.items():
+            for slot, data in slots.items():
+                if data and data[0] in teacher_of:
+                    key = (teacher_of[data[0]], day)
+                    masks[key] = masks.get(key, 0) | (1 << (slot - 1))
+    return masks
+
+
+def idle_gaps(mask, break_mask=0):
+    """Idle slots between the first and last busy slot; free break slots
+    (``break_mask``) do not count"""
+    if not mask:
+        return 0
+    span = (1 << mask.bit_length()) - (mask & -mask)
+    return bin(span & ~mask & ~break_mask).count("1")
+
+
+def unplaced_credits(courses, diagnostics):
+    """Credits of the unplaced sessions: each short course counts its credit
+    times the share of its sessions that are missing"""
+    credit_of = {c["code"]: c["credit"] for c in courses}
+    total = sum(credit_of.get(item["code"], 0) * (item["required"] - item["assigned"]) / item["required"]
+                for item in diagnostics["unplaced"] if item["required"])
+    return round(total, 6)  # so equal totals compare equal in ``key``
+
+
+def score_routine(routine, courses, pref_index, diagnostics, grid=None):
+    """Summarise a routine; lower ``key`` is better.
+
+    ``key`` orders by unplaced credits first (so a dropped 3-credit course
+    weighs more than a dropped 1-credit one), then by preference hits (more
+    is better), then by idle gaps in teachers' days.
+    """
+    masks = teacher_day_masks(routine, courses)
+    preference_hits = sum(bin(mask & pref_index.get(teacher, {}).get(day, 0)).count("1")
+                          for (teacher, day), mask in masks.items())
+    grid = grid or timegrid.DEFAULT
+    teacher_gaps = sum(idle_gaps(mask, grid.break_masks[day]) for (_, day), mask in masks.items())
+    unplaced = unplaced_credits(courses, diagnostics)
+    return {
+        "unplaced_credits": unplaced,
+        "missing_sessions": scheduler.missing_sessions(diagnostics),
+        "preference_hits": preference_hits,
+        "teacher_gaps": teacher_gaps,
+        "key": (unplaced, -preference_hits, teacher_gaps),
+    }
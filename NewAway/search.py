@@ -0,0 +1,364 @@
+"""Complete search solver: forward checking + conflict-directed backjumping.
+
+Each lab (even course) is one variable whose values are the grid's lab
+windows; each theory course (odd course) contributes one variable per credit
+whose values are lecture windows, ordered by day so the sessions of a course
+land on distinct days. Variables are picked by MRV (smallest live domain)
+with the degree heuristic as tie-break, and values are tried teacher
+preferences first.
+"""
+import sys
+import time
+
+import instrument
+import scheduler
+import timegrid
+from occupancy import Occupancy
+from resources import ResourceIndex, group_of
+
+
+SEARCH_REASONS = {
+    "complete": "more sessions than days in the week",
+    "infeasible": "no consistent window for every session (search exhausted)",
+    "budget": "search budget ran out before it was placed",
+}
+NO_WINDOW_REASON = "no free window for one of its sessions"
+
+
+class SearchBudgetExceeded(Exception):
+    pass
+
+
+class SearchCancelled(Exception):
+    """Raised out of ``run`` when the ``cancel`` event is set"""
+
+
+class Session:
+    __slots__ = ("course", "index", "values", "preferred", "neighbours", "watchers", "group", "checks")
+
+    def __init__(self, course, index, checks):
+        self.course = course
+        self.index = index
+        self.values = []  # (day_idx, slots, mask, room)
+        self.preferred = 0  # number of leading values that come from preferences
+        self.neighbours = []
+        self.watchers = []  # sessions that list this one among their neighbours
+        self.group = group_of(course)
+        self.checks = frozenset(checks)
+
+
+class SearchSolver:
+    def __init__(self, courses, teacher_priorities, node_limit=200000, time_limit=10.0, fixed=None,
+                 pref_index=None, rooms=None, progress=None, cancel=None, grid=None):
+        """``fixed`` is an optional Occupancy of already-placed courses to solve around
+        (its resource index is reused); ``pref_index`` is a precompiled
+        ``scheduler.compile_preferences`` index. ``progress(placed, total)`` is
+        called now and then with the best number of fully placed courses so far,
+        and setting the ``cancel`` event (e.g. a ``threading.Event``) aborts the run.
+        ``grid`` is the ``timegrid.TimeGrid`` the windows come from."""
+        self.courses = courses
+        self.grid = grid or timegrid.DEFAULT
+        self.progress = progress
+        self.cancel = cancel
+        self.fixed = fixed
+        self.index = fixed.index if fixed is not None else ResourceIndex(courses, rooms)
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.warnings = []
+        if pref_index is None:
+            pref_index, errors = scheduler.compile_preferences(teacher_priorities, self.grid)
+            self.warnings.extend(errors)
+        self.pref_index = pref_index
+        self.nodes = 0
+        self.backjumps = 0
+        self.checks = 0  # candidate values tested during forward checking
+        self.tried = {}  # session -> values tried
+        self.sessions = self._build_sessions()
+
+    # Model
+    def _build_sessions(self):
+        days = self.grid.days
+        sessions = []
+        for course in self.courses:
+            preferred = self._preferred_values(course)
+            rooms = self.index.rooms_for(course)
+            if not rooms:
+                self.warnings.append(f"{course['code']}: no room can host this course")
+            if scheduler.is_even_course(course["code"]):
+                all_values = [(d, window, mask, room) for d in range(len(days))
+                              for window, mask in self.grid.lab_windows[days[d]] for room in rooms]
+                sessions.append(self._make_session(course, 0, preferred, all_values))
+            else:
+                credit = int(course["credit"])
+                count = min(credit, len(days))
+                if count < credit:
+                    self.warnings.append(f"{course['code']}: {credit} credits but only {count} days")
+                for k in range(count):
+                    # Session k sits on a strictly later day than session k - 1
+                    all_values = [(d, window, mask, room)
+                                  for d in range(k, len(days) - (count - 1 - k))
+                                  for window, mask in self.grid.lecture_windows[days[d]]
+                                  for room in rooms]
+                    sessions.append(self._make_session(course, k, preferred, all_values))
+
+        self.session_counts = {}
+        for session in sessions:
+            code = session.course["code"]
+            self.session_counts[code] = self.session_counts.get(code, 0) + 1
+        # A session with no window left (e.g. its teacher is busy all week) is
+        # reported unplaced instead of making the whole search fail at once
+        self.unplaceable = [s for s in sessions if not s.values]
+        for session in self.unplaceable:
+            if self.index.rooms_for(session.course):
+                self.warnings.append(f"{session.course['code']}: no free window for session {session.index + 1}")
+        sessions = [s for s in sessions if s.values]
+
+        # Neighbours come from the conflict index, not from scanning every pair
+        by_code = {}
+        for session in sessions:
+            by_code.setdefault(session.course["code"], []).append(session)
+        for a in sessions:
+            a.neighbours = [b for b in by_code[a.course["code"]] if b is not a]
+            for other in self.index.neighbours(a.course):
+                a.neighbours.extend(by_code.get(other["code"], ()))
+        for a in sessions:
+            for b in a.neighbours:
+                b.watchers.append(a)
+        return sessions
+
+    def _make_session(self, course, index, preferred, all_values):
+        session = Session(course, index, self.index.checks(course))
+        if self.fixed is not None:
+            all_values = [v for v in all_values
+                          if self.fixed.fits(course, self.grid.days[v[0]], v[2], v[3])]
+        allowed = set((d, m, r) for d, _, m, r in all_values)
+        seen = set()
+        for value in preferred:
+            key = (value[0], value[2], value[3])
+            if key in allowed and key not in seen:
+                seen.add(key)
+                session.values.append(value)
+        session.preferred = len(session.values)
+        session.values.extend(v for v in all_values if (v[0], v[2], v[3]) not in seen)
+        return session
+
+    def _preferred_values(self, course):
+        teacher = course["teacher"]
+        even = scheduler.is_even_course(course["code"])
+        rooms = self.index.rooms_for(course)
+        values = []
+        for day, pref_mask in self.pref_index.get(teacher, {}).items():
+            day_idx = self.grid.days.index(day)
+            values.extend((day_idx, window, mask, room) for window, mask in self.grid.windows(day, even)
+                          if mask & pref_mask == mask for room in rooms)
+        return values
+
+    @staticmethod
+    def _conflicts(a, va, b, vb):
+        if a.course is b.course:
+            # Sessions of one course: strictly increasing days
+            return va[0] >= vb[0] if a.index < b.index else va[0] <= vb[0]
+        if va[0] != vb[0] or not (va[2] & vb[2]):
+            return False
+        return (a.course["teacher"] == b.course["teacher"] or a.group in b.checks
+                or (va[3] is not None and va[3] == vb[3]))
+
+    # Search
+    def run(self):
+        """Return ``(assignment, status)``; ``assignment`` maps session -> value"""
+        n = len(self.sessions)
+        self.alive = {s: [True] * len(s.values) for s in self.sessions}
+        self.alive_count = {s: len(s.values) for s in self.sessions}
+        self.pruned_by = {s: [] for s in self.sessions}
+        # Unassigned neighbours per session, kept current by _assign/_unassign
+        self.degree = {s: len(s.neighbours) for s in self.sessions}
+        self.assignment = {}
+        self.best = {}
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit else None
+
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(old_limit, 4 * n + 100))
+        try:
+            conflict = self._search()
+            status = "complete" if conflict is None else "infeasible"
+        except SearchBudgetExceeded:
+            status = "budget"
+        finally:
+            sys.setrecursionlimit(old_limit)
+
+        result = dict(self.assignment) if status == "complete" else self.best
+        if self.progress is not None:
+            self.progress(self.placed_courses(result), len(self.courses))
+        return result, status
+
+    def _select(self):
+        best = None
+        best_key = None
+        for s in self.sessions:
+            if s in self.assignment:
+                continue
+            key = (self.alive_count[s], -self.degree[s])
+            if best_key is None or key < best_key:
+                best, best_key = s, key
+                if key[0] <= 1:
+                    break
+        return best
+
+    def _search(self):
+        """Return None on success or the conflict set that forced a backtrack"""
+        if len(self.assignment) == len(self.sessions):
+            return None
+        var = self._select()
+        conflict = set()
+        alive = self.alive[var]
+        for i, value in enumerate(var.values):
+            if not alive[i]:
+                continue
+            self.nodes += 1
+            self.tried[var] = self.tried.get(var, 0) + 1
+            if self.node_limit and self.nodes > self.node_limit:
+                raise SearchBudgetExceeded()
+            if self.nodes % 256 == 0:
+                self._checkpoint()
+
+            self._assign(var, value)
+            if len(self.assignment) > len(self.best):
+                self.best = dict(self.assignment)
+            removed, wipeout = self._forward_check(var, value)
+            if wipeout is None:
+                result = self._search()
+                if result is None:
+                    return None
+                if var not in result:
+                    # Nothing about this variable caused the failure: jump past it
+                    self.backjumps += 1
+                    self._restore(var, removed)
+                    self._unassign(var)
+                    return result
+                conflict |= result
+            else:
+                conflict |= set(self.pruned_by[wipeout])
+            self._restore(var, removed)
+            self._unassign(var)
+
+        conflict |= set(self.pruned_by[var])
+        conflict.discard(var)
+        return conflict
+
+    def _assign(self, var, value):
+        self.assignment[var] = value
+        for watcher in var.watchers:
+            self.degree[watcher] -= 1
+
+    def _unassign(self, var):
+        del self.assignment[var]
+        for watcher in var.watchers:
+            self.degree[watcher] += 1
+
+    def _checkpoint(self):
+        if self.deadline and time.perf_counter() > self.deadline:
+            raise SearchBudgetExceeded()
+        if self.cancel is not None and self.cancel.is_set():
+            raise SearchCancelled()
+        if self.progress is not None:
+            self.progress(self.placed_courses(self.best), len(self.courses))
+
+    def placed_courses(self, assignment):
+        """Number of courses with every session in ``assignment``"""
+        counts = {}
+        for session in assignment:
+            counts[session.course["code"]] = counts.get(session.course["code"], 0) + 1
+        return sum(1 for code, n in counts.items() if n == self.session_counts[code])
+
+    def _forward_check(self, var, value):
+        removed = []
+        for other in var.neighbours:
+            if other in self.assignment:
+                continue
+            other_alive = self.alive[other]
+            self.checks += len(other.values)
+            pruned = False
+            for j, other_value in enumerate(other.values):
+                if other_alive[j] and self._conflicts(var, value, other, other_value):
+                    other_alive[j] = False
+                    self.alive_count[other] -= 1
+                    removed.append((other, j))
+                    pruned = True
+            if pruned:
+                self.pruned_by[other].append(var)
+                if self.alive_count[other] == 0:
+                    return removed, other
+        return removed, None
+
+    def _restore(self, var, removed):
+        for other, j in removed:
+            if not self.alive[other][j]:
+                self.alive[other][j] = True
+                self.alive_count[other] += 1
+        for other in set(other for other, _ in removed):
+            self.pruned_by[other].remove(var)
+
+
+def solve(courses, teacher_priorities, teachers=(), node_limit=200000, time_limit=10.0,
+          pref_index=None, rooms=None, profile=None, progress=None, cancel=None, busy=None,
+          grid=None):
+    """Search-based counterpart of ``scheduler.solve`` with the same return shape.
+
+    If the budget runs out the deepest partial assignment found is used, unless
+    the greedy passes place more sessions, in which case their routine wins.
+    ``busy`` is the same as for ``scheduler.solve``.
+    """
+    fixed = None
+    if busy:
+        fixed = Occupancy(ResourceIndex(courses, rooms))
+        fixed.block_teachers(busy)
+    with instrument.phase(profile, "search"):
+        solver = SearchSolver(courses, teacher_priorities, node_limit, time_limit, fixed=fixed,
+                              pref_index=pref_index, rooms=rooms, progress=progress, cancel=cancel,
+                              grid=grid)
+        assignment, status = solver.run()
+    if profile is not None:
+        profile.record_search(solver)
+        if fixed is not None:
+            profile.record_cache(fixed)
+
+    teacher_short_names = scheduler.generate_teacher_short_names(
+        list(teachers) + [c["teacher"] for c in courses])
+    routine = scheduler.empty_routine(solver.index, solver.grid)
+    occupancy = Occupancy(solver.index)
+    placed = {}
+    for session, (day_idx, slots, _, room) in assignment.items():
+        course = session.course
+        scheduler.place(routine, occupancy, course, solver.grid.days[day_idx], slots,
+                        teacher_short_names[course["teacher"]], room)
+        placed[id(course)] = placed.get(id(course), 0) + 1
+
+    diagnostics = {"unplaced": [], "warnings": list(solver.warnings),
+                   "search": {"status": status, "nodes": solver.nodes, "backjumps": solver.backjumps}}
+    by_code = {}
+    for course in courses:
+        by_code[course["code"]] = course
+        required = scheduler.required_sessions(course)
+        assigned = placed.get(id(course), 0)
+        if assigned < required:
+            diagnostics["unplaced"].append({"code": course["code"], "assigned": assigned, "required": required})
+
+    if status != "complete":
+        # The fallback is profiled separately and only merged in if it wins
+        greedy_profile = instrument.Profile() if profile is not None else None
+        with instrument.phase(profile, "greedy_fallback"):
+            greedy_routine, greedy_diagnostics = scheduler.solve(courses, teacher_priorities, teachers,
+                                                                    solver.pref_index, rooms=rooms,
+                                                                    profile=greedy_profile, busy=busy,
+                                                                    grid=solver.grid)
+        if scheduler.missing_sessions(greedy_diagnostics) < scheduler.missing_sessions(diagnostics):
+            greedy_diagnostics["search"] = dict(diagnostics["search"], fallback="greedy")
+            if profile is not None:
+                profile.merge(greedy_profile)
+            return greedy_routine, greedy_diagnostics
+    if profile is not None:
+        no_window = {s.course["code"] for s in solver.unplaceable}
+        for item in diagnostics["unplaced"]:
+            reason = NO_WINDOW_REASON if item["code"] in no_window else SEARCH_REASONS[status]
+            profile.record_unplaced(by_code[item["code"]], item["assigned"], item["required"], reason)
+    return routine, diagnostics
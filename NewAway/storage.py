@@ -0,0 +1,304 @@
+"""Crash-safe persistence for the data files.
+
+Full rewrites go through ``atomic_write`` (temp file + fsync + os.replace), so
+a crash leaves either the old or the new file, never a truncated one. The
+course catalogue is an append-only JSON-lines log: an add appends one line, a
+removal appends a ``{"op": "remove", "code": ...}`` tombstone, and the log is
+compacted atomically once tombstones pile up. ``CourseStore`` caches the parsed
+catalogue and only re-reads the file when its stat changes, parsing just the
+appended tail when the file merely grew. Every write (append or compaction)
+holds an exclusive lock and first catches up with what other writers added,
+so a half-written last line seen under that lock was left by a crash: it is
+ignored when reading and only cut off by the next locked write. A complete
+last record that just lacks its newline (a hand-edited file) is kept.
+"""
+import contextlib
+import json
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _file_mode(path):
+    """Permission bits of ``path``, or what a new file would get under the umask"""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write(path, lines):
+    directory = os.path.dirname(os.path.abspath(path))
+    mode = _file_mode(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.writelines(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp creates the file 0600; keep the permissions the data file had
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _ends_mid_line(path):
+    """True if ``path`` is non-empty and its last byte is not a newline"""
+    try:
+        with open(path, "rb") as file:
+            file.seek(0, os.SEEK_END)
+            if not file.tell():
+                return False
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) != b"\n"
+    except FileNotFoundError:
+        return False
+
+
+@contextlib.contextmanager
+def locked(path):
+    """Hold the exclusive lock guarding ``path`` for the ``with`` block.
+
+    The lock is taken on a ``<path>.lock`` file next to it rather than on the
+    data file, whose inode ``atomic_write`` swaps out.
+    """
+    with open(path + ".lock", "a") as lock:
+        fd = lock.fileno()
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def _appending(path):
+    """Open ``path`` for appending and fsync it when the block ends; the
+    caller holds ``locked(path)``"""
+    with open(path, "a") as file:
+        yield file
+        file.flush()
+        os.fsync(file.fileno())
+
+
+@contextlib.contextmanager
+def locked_append(path):
+    """Open ``path`` for appending and hold its lock for the ``with`` block"""
+    with locked(path), _appending(path) as file:
+        yield file
+
+
+def end_last_line(path, file):
+    """End a hand-edited last line missing its newline so the next append
+    does not merge into it"""
+    if _ends_mid_line(path):
+        file.write("\n")
+
+
+def append_lines(path, lines):
+    with locked_append(path) as file:
+        end_last_line(path, file)
+        file.writelines(lines)
+
+
+def apply_course_record(courses, record):
+    """Apply one log line to ``courses`` (a code -> course dict)"""
+    if record.get("op") == "remove":
+        courses.pop(record["code"], None)
+    else:
+        courses[record["code"]] = record
+
+
+def complete_record(text):
+    """The course record ``text`` holds, or None if it is not a whole one
+    (e.g. half a line left by a crash)"""
+    try:
+        record = json.loads(text)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) and "code" in record else None
+
+
+def read_courses(path):
+    """Parse a course log from scratch, replaying tombstones"""
+    courses = {}
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                if line.endswith("\n"):
+                    record = json.loads(line)
+                else:
+                    record = complete_record(line)
+                    if record is None:
+                        break  # a half-written last line
+                apply_course_record(courses, record)
+    return list(courses.values())
+
+
+class CourseStore:
+    def __init__(self, path, compact_ratio=0.25, compact_min=32):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self.version = 0  # bumped whenever the catalogue changes
+        self._courses = {}
+        self._tombstones = 0
+        self._stat = None
+        self._offset = 0
+        self._tail = b""  # last line read, to check the file was only appended to
+
+    def load(self):
+        """Return the current catalogue, re-reading only what changed on disk"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._stat is not None or self._courses:
+                self._reset()
+                self.version += 1
+            return []
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key == self._stat:
+            return list(self._courses.values())
+        if self._stat and stat.st_ino == self._stat[0] and stat.st_size > self._offset and self._same_prefix():
+            self._read_from(self._offset)
+        else:
+            self._reset()
+            self._read_from(0)
+        self._stat = key
+        self.version += 1
+        return list(self._courses.values())
+
+    def append(self, course):
+        self.extend([course])
+
+    def extend(self, courses):
+        """Append several courses with one write"""
+        with locked(self.path):
+            self._sync()
+            self._write_records(list(courses))
+
+    def remove(self, code):
+        with locked(self.path):
+            self._sync()
+            if code not in self._courses:
+                return False
+            self._write_records([{"op": "remove", "code": code}])
+            self._tombstones += 1
+            if self._tombstones >= max(self.compact_min, self.compact_ratio * len(self._courses)):
+                self._rewrite()
+        return True
+
+    def replace_all(self, courses):
+        with locked(self.path):
+            self._courses = {c["code"]: c for c in courses}
+            self._rewrite()
+
+    def compact(self):
+        """Rewrite the log with only live courses"""
+        with locked(self.path):
+            self._sync()
+            self._rewrite()
+
+    # Internals; the callers below hold locked(self.path)
+    def _reset(self):
+        self._courses = {}
+        self._tombstones = 0
+        self._stat = None
+        self._offset = 0
+        self._tail = b""
+
+    def _sync(self):
+        """Catch up with what other writers appended and cut a torn last line.
+
+        No writer is mid-write while we hold the lock, so an unterminated last
+        line that is not a complete record was left by a crash.
+        """
+        self.load()
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        if size > self._offset:
+            with open(self.path, "rb") as file:
+                file.seek(self._offset)
+                tail = file.read()
+            if complete_record(tail) is None:
+                os.truncate(self.path, self._offset)
+                self._remember_stat()
+
+    def _write_records(self, records):
+        data = "".join(f"{json.dumps(r)}\n" for r in records)
+        with _appending(self.path) as file:
+            end_last_line(self.path, file)
+            file.write(data)
+        for record in records:
+            apply_course_record(self._courses, record)
+        self._remember_stat()
+        self.version += 1
+
+    def _rewrite(self):
+        atomic_write(self.path, (f"{json.dumps(c)}\n" for c in self._courses.values()))
+        self._tombstones = 0
+        self._remember_stat()
+        self.version += 1
+
+    def _remember_stat(self):
+        stat = os.stat(self.path)
+        self._stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._offset = stat.st_size
+        with open(self.path, "rb") as file:
+            file.seek(max(0, stat.st_size - 4096))
+            lines = file.read().splitlines(keepends=True)
+        self._tail = lines[-1] if lines else b""
+
+    def _same_prefix(self):
+        if not self._tail:
+            return self._offset == 0
+        with open(self.path, "rb") as file:
+            file.seek(self._offset - len(self._tail))
+            return file.read(len(self._tail)) == self._tail
+
+    def _read_from(self, offset):
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            data = file.read()
+        lines = data.splitlines(keepends=True)
+        tail = b""
+        if lines and not lines[-1].endswith(b"\n"):
+            # An unterminated last line is read again once it is ended; until
+            # then a complete record (e.g. a hand-edited file) is used and a
+            # half-written one (e.g. a crash mid-append) is skipped
+            tail = lines.pop()
+        for line in lines:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("op") == "remove":
+                    self._tombstones += 1
+                apply_course_record(self._courses, record)
+        if tail:
+            record = complete_record(tail)
+            if record is not None:
+                apply_course_record(self._courses, record)
+        self._offset = offset + len(data) - len(tail)
+        if lines:
+            self._tail = lines[-1]
@@ -0,0 +1,197 @@
+"""The weekly time grid: teaching days, slots, their clock times and breaks.
+
+Everything that knows what a slot is reads it from a ``TimeGrid``: the
+solvers take their candidate windows from it, preferences are parsed
+against its slot boundaries and the renderers take their column labels from
+it. The default grid is the original week: Sunday-Thursday, eight one-hour
+slots from 9am with the 1-2pm slot as the break.
+
+A grid can be described in ``grid.json`` (``load_grid``)::
+
+    {"days": ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"],
+     "start": "9am", "slot_minutes": 30, "slots": 16, "breaks": [9, 10],
+     "lab_length": 6, "lecture_length": 2,
+     "day_overrides": {"Thursday": {"slots": 8, "breaks": []}}}
+
+``slot_minutes`` is one length for every slot or a list with one length per
+slot. A lab takes ``lab_length`` consecutive slots and a lecture
+``lecture_length``. A window longer than one slot never includes a break
+slot; a single-slot lecture may still use it. ``day_overrides`` change the
+number of open slots (e.g. a half day) or the breaks of one day; a closed
+slot is never offered to the solvers.
+
+All windows are enumerated once when the grid is built, so the solvers only
+look them up.
+"""
+import json
+import os
+
+from occupancy import slot_bit, window_mask
+
+DEFAULT_DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
+
+
+def parse_clock(text):
+    """Convert '9am' / '12pm' / '4:30pm' to minutes after midnight"""
+    text = text.strip().lower()
+    hour, _, minute = text[:-2].partition(":")
+    if (text[-2:] not in ("am", "pm") or not hour.isdigit() or not 1 <= int(hour) <= 12
+            or (minute and (len(minute) != 2 or not minute.isdigit() or int(minute) > 59))):
+        raise ValueError(f"Invalid time: {text}")
+    hour = int(hour) % 12 + (12 if text.endswith("pm") else 0)
+    return hour * 60 + int(minute or 0)
+
+
+def format_clock(minutes):
+    """Inverse of ``parse_clock``: 780 -> '1pm', 810 -> '1:30pm'"""
+    hour, minute = divmod(minutes, 60)
+    suffix = "am" if hour < 12 else "pm"
+    return f"{hour % 12 or 12}{f':{minute:02d}' if minute else ''}{suffix}"
+
+
+def _short_clock(minutes):
+    hour, minute = divmod(minutes, 60)
+    return f"{hour % 12 or 12}:{minute:02d}" if minute else f"{hour % 12 or 12}"
+
+
+def _windows(length, open_mask, break_mask, slots):
+    """Every run of ``length`` open slots, as ``(slots, mask)`` in slot order"""
+    windows = []
+    for first in slots:
+        window = list(range(first, first + length))
+        mask = window_mask(window)
+        if mask & open_mask != mask:
+            continue
+        if length > 1 and mask & break_mask:
+            continue
+        windows.append((window, mask))
+    return windows
+
+
+def _is_list_of(value, kind):
+    return isinstance(value, (list, tuple)) and all(isinstance(v, kind) for v in value)
+
+
+class TimeGrid:
+    def __init__(self, days=None, start="9am", slot_minutes=60, slots=8, breaks=(5,),
+                 lab_length=3, lecture_length=1, day_overrides=None):
+        if days is not None and not _is_list_of(days, str):
+            raise ValueError("days must be a list of day names")
+        self.days = list(days or DEFAULT_DAYS)
+        if not self.days or len(set(self.days)) != len(self.days):
+            raise ValueError("days must be a non-empty list of distinct names")
+        if not _is_list_of(breaks, int):
+            raise ValueError("breaks must be a list of slot numbers")
+        if day_overrides is not None and not (isinstance(day_overrides, dict)
+                                              and all(isinstance(v, dict) for v in day_overrides.values())):
+            raise ValueError("day_overrides must map day names to objects")
+        if not isinstance(slots, int) or slots < 1:
+            raise ValueError("slots must be a positive integer")
+        lengths = slot_minutes if isinstance(slot_minutes, list) else [slot_minutes] * slots
+        if len(lengths) != slots or any(not isinstance(n, int) or n <= 0 for n in lengths):
+            raise ValueError("slot_minutes must be a positive length or one length per slot")
+        if (not isinstance(lab_length, int) or not isinstance(lecture_length, int)
+                or lab_length < 1 or lecture_length < 1):
+            raise ValueError("lab_length and lecture_length must be at least 1")
+        self.lab_length = lab_length
+        self.lecture_length = lecture_length
+        self.slots = list(range(1, slots + 1))
+        self.config = {"days": self.days, "start": start, "slot_minutes": slot_minutes, "slots": slots,
+                       "breaks": list(breaks), "lab_length": lab_length,
+                       "lecture_length": lecture_length, "day_overrides": dict(day_overrides or {})}
+
+        # Clock times and labels
+        self.times = {}  # slot -> (start, end) in minutes after midnight
+        clock = parse_clock(start) if isinstance(start, str) else start
+        for slot, length in zip(self.slots, lengths):
+            self.times[slot] = (clock, clock + length)
+            clock += length
+        self.labels = {slot: f"{_short_clock(s)}-{_short_clock(e)}" for slot, (s, e) in self.times.items()}
+        self.slot_starting = {s: slot for slot, (s, _) in self.times.items()}
+        self.slot_ending = {e: slot for slot, (_, e) in self.times.items()}
+
+        # Per-day open slots, breaks and candidate windows
+        self.open_masks = {}
+        self.break_masks = {}
+        self.lab_windows = {}
+        self.lecture_windows = {}
+        for day in self.days:
+            override = self.config["day_overrides"].get(day, {})
+            open_slots = override.get("slots", slots)
+            day_breaks = override.get("breaks", breaks)
+            if not isinstance(open_slots, int) or not 0 <= open_slots <= slots:
+                raise ValueError(f"{day}: open slots must be between 0 and {slots}")
+            if not _is_list_of(day_breaks, int) or any(b not in self.times for b in day_breaks):
+                raise ValueError(f"{day}: break slots must be between 1 and {slots}")
+            self.open_masks[day] = (1 << open_slots) - 1
+            self.break_masks[day] = window_mask(day_breaks)
+            self.lab_windows[day] = _windows(lab_length, self.open_masks[day], self.break_masks[day],
+                                             self.slots)
+            self.lecture_windows[day] = _windows(lecture_length, self.open_masks[day],
+                                                 self.break_masks[day], self.slots)
+        unknown = set(self.config["day_overrides"]) - set(self.days)
+        if unknown:
+            raise ValueError(f"day_overrides for unknown days: {', '.join(sorted(unknown))}")
+
+    @classmethod
+    def from_dict(cls, data):
+        known = ("days", "start", "slot_minutes", "slots", "breaks", "lab_length", "lecture_length",
+                 "day_overrides")
+        unknown = set(data) - set(known)
+        if unknown:
+            raise ValueError(f"unknown grid settings: {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    def to_dict(self):
+        return dict(self.config)
+
+    def label(self, slot):
+        """'9-10', '12-1', '9:30-10' ... from the slot's clock times"""
+        return self.labels[slot]
+
+    def is_open(self, day, slot):
+        return bool(self.open_masks[day] & slot_bit(slot))
+
+    def is_break(self, day, slot):
+        return bool(self.break_masks[day] & slot_bit(slot))
+
+    def windows(self, day, lab):
+        """Candidate ``(slots, mask)`` windows on ``day`` for a lab or a lecture"""
+        return self.lab_windows[day] if lab else self.lecture_windows[day]
+
+    def parse_time_range(self, time_range):
+        """Map a range like '12pm-5pm' to every slot it spans, raising ValueError if
+        either end does not fall on a slot boundary"""
+        parts = time_range.split("-")
+        if len(parts) != 2:
+            raise ValueError(f"Invalid time range: {time_range}")
+        start, end = parse_clock(parts[0]), parse_clock(parts[1])
+        if start not in self.slot_starting:
+            raise ValueError(f"{parts[0].strip()} is not the start of a slot")
+        if end not in self.slot_ending:
+            raise ValueError(f"{parts[1].strip()} is not the end of a slot")
+        if start >= end:
+            raise ValueError(f"Invalid time range: {time_range}")
+        return list(range(self.slot_starting[start], self.slot_ending[end] + 1))
+
+    def parse_preference(self, pref):
+        """Split 'Wednesday 12pm-5pm' into ('Wednesday', slot mask); slots the
+        day does not open are dropped"""
+        day, _, time_range = pref.strip().partition(" ")
+        if day not in self.open_masks:
+            raise ValueError(f"Unknown day: {day}")
+        return day, window_mask(self.parse_time_range(time_range.strip())) & self.open_masks[day]
+
+
+DEFAULT = TimeGrid()
+
+
+def load_grid(path):
+    """Read a grid from ``path``; the default grid if the file is missing"""
+    if not path or not os.path.exists(path):
+        return DEFAULT
+    with open(path, "r") as file:
+        data = json.load(file)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    return TimeGrid.from_dict(data)
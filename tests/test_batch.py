@@ -0,0 +1,108 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NewAway"))
+
+import batch
+import bench
+import scheduler
+import scoring
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.availability = os.path.join(self.dir.name, "availability.json")
+        # Generated departments draw teachers from the same names, so they share most of them
+        for seed, name in enumerate(["cse", "eee", "math"]):
+            folder = os.path.join(self.dir.name, name)
+            os.makedirs(folder)
+            bench.write_instance(folder, *bench.generate_instance(24, n_teachers=4, seed=seed))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def run_batch(self, names, method):
+        out_dir = os.path.join(self.dir.name, "out")
+        argv = [os.path.join(self.dir.name, name) for name in names]
+        argv += ["--out-dir", out_dir, "--availability", self.availability, "--method", method,
+                 "--node-limit", "3000", "--workers", "1", "--no-pdf"]
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(batch.main(argv), 0)
+        with open(os.path.join(out_dir, "summary.json")) as file:
+            return json.load(file)
+
+    def bookings(self):
+        return {name: batch.busy_masks({name: teachers})
+                for name, teachers in batch.load_availability(self.availability).items()}
+
+    def assertNoOverlap(self, bookings):
+        names = sorted(bookings)
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                for key, mask in bookings[a].items():
+                    self.assertFalse(mask & bookings[b].get(key, 0), f"{key} booked by {a} and {b}")
+
+    def test_shared_teachers_are_not_double_booked(self):
+        for method in ("greedy", "search"):
+            with self.subTest(method=method):
+                departments = [batch.load_department(os.path.join(self.dir.name, name))
+                               for name in ("cse", "eee")]
+                self.assertEqual(len(batch.independent_groups(departments)), 1)
+                solved, _ = batch.solve_batch(departments, method=method, node_limit=3000, workers=1)
+                self.assertNoOverlap({d["name"]: scoring.teacher_day_masks(solved[d["name"]][0], d["courses"])
+                                      for d in departments})
+                self.assertTrue(any(scheduler.missing_sessions(solved[d["name"]][1]) == 0
+                                    for d in departments))
+
+    def test_availability_store_blocks_other_departments_only(self):
+        for method in ("greedy", "search"):
+            with self.subTest(method=method):
+                if os.path.exists(self.availability):
+                    os.remove(self.availability)
+                first = self.run_batch(["cse", "eee"], method)
+                self.assertEqual(sorted(self.bookings()), ["cse", "eee"])
+
+                # Re-running replaces its own bookings instead of colliding with them
+                again = self.run_batch(["cse", "eee"], method)
+                self.assertEqual(again, first)
+                self.assertNoOverlap(self.bookings())
+
+                # A department outside the batch is solved around both
+                self.run_batch(["math"], method)
+                bookings = self.bookings()
+                self.assertEqual(sorted(bookings), ["cse", "eee", "math"])
+                self.assertTrue(bookings["math"])
+                self.assertNoOverlap(bookings)
+
+
+    def run_failing(self, argv):
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            self.assertEqual(batch.main([os.path.join(self.dir.name, "cse"), "--no-pdf",
+                                         "--out-dir", os.path.join(self.dir.name, "out")] + argv), 1)
+        return stderr.getvalue()
+
+    def test_malformed_availability_is_an_error(self):
+        for text in ("{", '{"cse": ["Teacher"]}', '{"cse": {"T": {"Sunday": "1"}}}'):
+            with self.subTest(text=text):
+                with open(self.availability, "w") as file:
+                    file.write(text)
+                self.assertTrue(self.run_failing(["--availability", self.availability]).startswith(
+                    f"Error: {self.availability}: "))
+
+    def test_calendar_export_on_a_non_weekday_grid_is_an_error(self):
+        grid = os.path.join(self.dir.name, "grid.json")
+        with open(grid, "w") as file:
+            json.dump({"days": ["Day 1", "Day 2", "Day 3", "Day 4", "Day 5"]}, file)
+        stderr = self.run_failing(["--grid", grid, "--export", "ics", "--method", "greedy"])
+        self.assertEqual(stderr, "Error: 'Day 1' is not a weekday name, so it cannot be put on a calendar\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
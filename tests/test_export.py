@@ -0,0 +1,90 @@
+import csv
+import datetime
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NewAway"))
+
+import export
+import scheduler
+
+COURSES = [
+    {"code": "CSE 1102", "name": "Lab", "year": 1, "credit": 1.5, "teacher": "Lab Teacher"},
+    {"code": "CSE 1101", "name": "Theory", "year": 1, "credit": 2.0, "teacher": "Theory Teacher"},
+    {"code": "CSE 1103", "name": "Section B", "year": 1, "credit": 1.0, "teacher": "Section Teacher",
+     "section": "B"},
+]
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.routine, diagnostics = scheduler.solve(COURSES, {})
+        self.assertEqual(diagnostics["unplaced"], [])
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def export(self, formats):
+        return export.export_all(self.routine, COURSES, self.dir.name, formats,
+                                 term_start=datetime.date(2026, 1, 4), weeks=3)
+
+    def test_lab_is_one_session_in_json_and_csv(self):
+        self.export(["json", "csv"])
+        with open(os.path.join(self.dir.name, "routine.json")) as file:
+            sessions = json.load(file)["sessions"]
+        with open(os.path.join(self.dir.name, "routine.csv"), newline="") as file:
+            rows = list(csv.DictReader(file))
+
+        self.assertEqual([s["code"] for s in sessions], [r["code"] for r in rows])
+        self.assertEqual(sorted(s["code"] for s in sessions), ["CSE 1101", "CSE 1101", "CSE 1102", "CSE 1103"])
+        lab = next(s for s in sessions if s["code"] == "CSE 1102")
+        lab_row = next(r for r in rows if r["code"] == "CSE 1102")
+        self.assertEqual(len(lab["slots"]), 3)
+        self.assertEqual(lab_row["slots"], ";".join(str(s) for s in lab["slots"]))
+        self.assertEqual((lab_row["start"], lab_row["end"]), (lab["start"], lab["end"]))
+
+    def test_section_calendar_includes_year_wide_sessions(self):
+        self.export(["ics"])
+        with open(os.path.join(self.dir.name, "year_1_B.ics"), newline="") as file:
+            section = file.read()
+        with open(os.path.join(self.dir.name, "year_1.ics"), newline="") as file:
+            year = file.read()
+
+        self.assertEqual(section.count("BEGIN:VEVENT"), 4)
+        for code in ("CSE 1101", "CSE 1102", "CSE 1103"):
+            self.assertIn(f"SUMMARY:{code}", section)
+        self.assertEqual(year.count("BEGIN:VEVENT"), 3)
+        self.assertNotIn("CSE 1103", year)
+        self.assertIn("RRULE:FREQ=WEEKLY;COUNT=3\r\n", section)
+
+    def test_calendar_text_escapes_and_folds(self):
+        session = {"code": "CSE 1101", "name": "Data; Structures, Part\\1\nLab", "group": "1st Year",
+                   "teacher": "T", "day": "Sunday", "start": "09:00", "end": "10:00",
+                   "room": "Room " + "x" * 80}
+        text = export.calendar_text("Cal", [session], {"Sunday": datetime.date(2026, 1, 4)}, 2,
+                                    "20260101T000000Z")
+
+        self.assertIn("SUMMARY:CSE 1101 Data\\; Structures\\, Part\\\\1\\nLab\r\n", text)
+        self.assertIn("DESCRIPTION:1st Year\\, T\r\n", text)
+        lines = text.split("\r\n")
+        self.assertTrue(all(len(line.encode("utf-8")) <= 75 for line in lines))
+        unfolded = text.replace("\r\n ", "")
+        self.assertIn("LOCATION:Room " + "x" * 80 + "\r\n", unfolded)
+
+    def test_fold_counts_octets(self):
+        line = "SUMMARY:" + "é" * 40
+        folded = export._fold(line)
+        parts = folded.split("\r\n")
+        self.assertTrue(folded.endswith("\r\n"))
+        self.assertTrue(all(len(part.encode("utf-8")) <= 75 for part in parts))
+        self.assertTrue(all(part.startswith(" ") for part in parts[1:-1]))
+        self.assertEqual(folded.replace("\r\n ", "").rstrip("\r\n"), line)
+        self.assertEqual(export._fold("SHORT:x"), "SHORT:x\r\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
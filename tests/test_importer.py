@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NewAway"))
+
+import importer
+
+
+def course(code, teacher, section=None):
+    course = {"code": code, "name": "Course", "year": 1, "credit": 3, "teacher": teacher}
+    if section:
+        course["section"] = section
+    return course
+
+
+class ValidateTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.teachers = ["Known", "No Priority"]
+        self.priorities = {"Known": {"priority": 1, "slots": []}}
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w") as file:
+            json.dump(data, file)
+        return path
+
+    def validate(self, data, courses=()):
+        return importer.validate([self.write("catalogue.json", data)], self.teachers, self.priorities,
+                                 courses=courses)
+
+    def test_teacher_on_disk(self):
+        report = self.validate({"courses": [course("CSE 1101", "Known")]})
+        self.assertEqual(report.errors, [])
+
+    def test_unknown_teacher(self):
+        report = self.validate({"courses": [course("CSE 1101", "Stranger")]})
+        self.assertEqual(report.errors, ["catalogue.json:1: CSE 1101: teacher 'Stranger' is not in teachers.txt"])
+
+    def test_teacher_missing_priority(self):
+        report = self.validate({"courses": [course("CSE 1101", "No Priority")]})
+        self.assertEqual(report.errors,
+                         ["catalogue.json:1: CSE 1101: teacher 'No Priority' is missing from priority.txt"])
+
+    def test_teacher_imported_alongside(self):
+        report = self.validate({"teachers": [{"name": "New", "department": "CSE", "priority": 2,
+                                              "slots": "Monday 9am-12pm"}],
+                                "courses": [course("CSE 1101", "New")]})
+        self.assertEqual(report.errors, [])
+        self.assertEqual(report.priorities["New"], {"priority": 2, "slots": ["Monday 9am-12pm"]})
+
+    def test_course_in_another_file(self):
+        staff = self.write("staff.json", [{"name": "New", "priority": 2}])
+        courses = self.write("courses.json", [course("CSE 1101", "New")])
+        report = importer.validate([courses, staff], self.teachers, self.priorities)
+        self.assertEqual(report.errors, [])
+
+    def test_imported_teacher_without_priority(self):
+        report = self.validate({"teachers": [{"name": "New"}]})
+        self.assertEqual(report.errors, ["teacher 'New' has no priority (missing from priority.txt)"])
+
+    def test_section_reusing_a_code(self):
+        report = self.validate({"courses": [course("CSE 1201", "Known", "B")]},
+                               courses=[course("CSE 1201", "Known", "A")])
+        self.assertEqual(len(report.errors), 1)
+        self.assertIn("each section needs its own code", report.errors[0])
+        # The same section is an update
+        report = self.validate({"courses": [course("CSE 1201", "Known", "A")]},
+                               courses=[course("CSE 1201", "Known", "A")])
+        self.assertEqual(report.errors, [])
+
+    def test_unreadable_files_are_errors(self):
+        text = self.write("notes.txt", [])
+        report = importer.validate([text, self.write("number.json", 5)], self.teachers, self.priorities)
+        self.assertEqual(report.errors, [
+            f"{text}: unsupported file type (use .csv, .json or .jsonl)",
+            f"{os.path.join(self.dir.name, 'number.json')}: expected a list of records or an object with "
+            f"'teachers' / 'courses' lists"])
+
+
+    def test_commas_in_teacher_names_and_slots(self):
+        path = os.path.join(self.dir.name, "staff.csv")
+        with open(path, "w") as file:
+            file.write('name,department,priority,slots\n"Smith, John",CSE,1,Monday 9am-12pm\n'
+                       'Doe,CSE,2,"Monday 9am-10am, Tuesday 9am-10am"\n')
+        report = importer.validate([path], self.teachers, self.priorities)
+        self.assertEqual(report.errors, [
+            "staff.csv:2: teacher name 'Smith, John' must not contain ','",
+            "staff.csv:3: Doe: 'Monday 9am-10am, Tuesday 9am-10am' must not contain ','"])
+
+        report = self.validate({"courses": [course("CSE 1101", "Smith, John")]})
+        self.assertEqual(report.errors, ["catalogue.json:1: CSE 1101: teacher 'Smith, John' must not contain ','"])
+
+
+if __name__ == "__main__":
+    unittest.main()
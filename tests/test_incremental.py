@@ -0,0 +1,114 @@
+import os
+import random
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NewAway"))
+
+import bench
+import incremental
+import scheduler
+import search
+
+
+def normalized(placements):
+    return {code: sorted((day, tuple(sorted(slots)), room) for day, slots, room in placed)
+            for code, placed in placements.items()}
+
+
+class IncrementalSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.teachers, priorities, self.courses = bench.generate_instance(200, seed=1)
+        self.engine = incremental.IncrementalScheduler(priorities, self.teachers)
+        self.engine.solve_all(self.courses)
+        self.assertEqual(self.engine.diagnostics()["unplaced"], [])
+
+    @staticmethod
+    def unplaceable_course():
+        """Six sessions never fit a five-day week, so level 1 places five and
+        levels 2 and 3 cannot do better"""
+        return {"code": "CSE 90001", "name": "New", "year": 99, "credit": 6.0,
+                "teacher": "Teacher New T0"}
+
+    def assertConsistent(self):
+        engine = self.engine
+        from_routine = scheduler.routine_placements(engine.routine, list(engine.courses.values()))
+        self.assertEqual(normalized(engine.placements), normalized(from_routine))
+
+    def assertUnchanged(self, before, codes):
+        after = normalized(self.engine.placements)
+        for code in codes:
+            self.assertEqual(after[code], before[code], code)
+
+    def test_remove_moves_nothing(self):
+        before = normalized(self.engine.placements)
+        code = self.courses[0]["code"]
+        self.engine.remove_course(code)
+
+        self.assertEqual(self.engine.last_stats["moved"], 0)
+        self.assertNotIn(code, self.engine.placements)
+        self.assertUnchanged(before, self.engine.courses)
+        self.assertConsistent()
+
+    def test_add_moves_only_the_new_course(self):
+        before = normalized(self.engine.placements)
+        course = {"code": "CSE 90001", "name": "New", "year": 1, "credit": 2.0,
+                  "teacher": "Teacher New T0"}
+        self.engine.add_course(course)
+
+        self.assertEqual(self.engine.last_stats["level"], 1)
+        self.assertEqual(self.engine.last_stats["moved"], 1)
+        self.assertEqual(len(self.engine.placements["CSE 90001"]), 2)
+        self.assertUnchanged(before, before)
+        self.assertConsistent()
+
+    def test_non_improving_resolve_is_rolled_back(self):
+        before = normalized(self.engine.placements)
+        course = self.unplaceable_course()
+        self.engine.add_course(course)
+
+        self.assertEqual(self.engine.last_stats["level"], 3)
+        self.assertEqual(self.engine.last_stats["moved"], 1)
+        self.assertEqual(len(self.engine.placements["CSE 90001"]), 5)
+        self.assertUnchanged(before, before)
+        self.assertConsistent()
+
+    def test_cancel_restores_placements(self):
+        before = normalized(self.engine.placements)
+        self.engine.cancel = threading.Event()
+        self.engine.cancel.set()
+        course = self.unplaceable_course()
+        with self.assertRaises(search.SearchCancelled):
+            self.engine.add_course(course)
+
+        # Level 3 searches every course, long enough to see the cancel; the
+        # level 1 placement of the new course stays
+        self.assertEqual(len(self.engine.placements["CSE 90001"]), 5)
+        self.assertUnchanged(before, before)
+        self.assertConsistent()
+
+    def test_random_edits_stay_consistent(self):
+        rng = random.Random(0)
+        catalogue = {c["code"]: c for c in self.courses}
+        for step in range(20):
+            action = rng.choice(["add", "remove", "sync"])
+            if action == "remove":
+                code = rng.choice(sorted(catalogue))
+                del catalogue[code]
+                self.engine.remove_course(code)
+            else:
+                course = {"code": f"CSE {90001 + 2 * step}", "name": "New", "year": rng.randint(1, 25),
+                          "credit": 3.0, "teacher": rng.choice(self.teachers)}
+                catalogue[course["code"]] = course
+                if action == "add":
+                    self.engine.add_course(course)
+                else:
+                    self.engine.sync(list(catalogue.values()))
+            with self.subTest(step=step, action=action):
+                self.assertEqual(set(self.engine.courses), set(catalogue))
+                self.assertConsistent()
+
+
+if __name__ == "__main__":
+    unittest.main()
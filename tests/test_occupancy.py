@@ -0,0 +1,90 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NewAway"))
+
+from occupancy import Occupancy, window_mask
+from resources import ResourceIndex
+
+DAY = "Sunday"
+
+
+def course(code, teacher, year, section=None):
+    course = {"code": code, "name": "", "year": year, "credit": 3.0, "teacher": teacher}
+    if section:
+        course["section"] = section
+    return course
+
+
+def uncached_mask(occupancy, course, day):
+    mask = occupancy.teacher_mask(course["teacher"], day)
+    for group in occupancy.index.checks(course):
+        mask |= occupancy.year_mask(group, day)
+    return mask
+
+
+class BlockedMaskTest(unittest.TestCase):
+    def setUp(self):
+        self.year = course("CSE 1101", "A", 1)
+        self.same_teacher = course("CSE 2101", "A", 2)
+        self.same_year = course("CSE 1103", "B", 1)
+        self.occupancy = Occupancy(ResourceIndex([self.year, self.same_teacher, self.same_year]))
+
+    def test_take_by_same_teacher_invalidates(self):
+        self.assertEqual(self.occupancy.blocked_mask(self.year, DAY), 0)
+        self.occupancy.take(self.same_teacher, DAY, window_mask([2]))
+        self.assertEqual(self.occupancy.blocked_mask(self.year, DAY), window_mask([2]))
+
+    def test_take_by_same_group_invalidates(self):
+        self.assertEqual(self.occupancy.blocked_mask(self.year, DAY), 0)
+        self.occupancy.take(self.same_year, DAY, window_mask([3]))
+        self.assertEqual(self.occupancy.blocked_mask(self.year, DAY), window_mask([3]))
+
+    def test_release_invalidates(self):
+        self.occupancy.take(self.same_year, DAY, window_mask([3]))
+        self.assertEqual(self.occupancy.blocked_mask(self.year, DAY), window_mask([3]))
+        self.occupancy.release(self.same_year, DAY, window_mask([3]))
+        self.assertEqual(self.occupancy.blocked_mask(self.year, DAY), 0)
+
+    def test_other_day_stays_cached(self):
+        self.occupancy.blocked_mask(self.year, "Monday")
+        self.occupancy.take(self.same_year, DAY, window_mask([3]))
+        hits = self.occupancy.cache_hits
+        self.assertEqual(self.occupancy.blocked_mask(self.year, "Monday"), 0)
+        self.assertEqual(self.occupancy.cache_hits, hits + 1)
+
+    def test_new_section_invalidates_year_wide_course(self):
+        self.assertEqual(self.occupancy.blocked_mask(self.year, DAY), 0)
+        # Cached before section A existed, so the year course did not check it yet
+        section = course("CSE 1105", "C", 1, "A")
+        self.occupancy.index.add(section)
+        self.occupancy.take(section, DAY, window_mask([4]))
+        self.assertEqual(self.occupancy.blocked_mask(self.year, DAY), window_mask([4]))
+
+    def test_matches_uncached_masks(self):
+        rng = random.Random(0)
+        courses = [course(f"C {i}", rng.choice("ABC"), rng.randint(1, 2), rng.choice([None, "A", "B"]))
+                   for i in range(12)]
+        index = ResourceIndex(courses[:6])
+        occupancy = Occupancy(index)
+        taken = []
+        for step in range(500):
+            action = rng.random()
+            if action < 0.05:
+                # Courses 6-11 start outside the index, some with new sections
+                index.add(rng.choice(courses[6:]))
+            elif action < 0.5 or not taken:
+                day, mask = rng.choice([DAY, "Monday"]), window_mask([rng.randint(1, 8)])
+                taken.append((rng.choice(courses), day, mask))
+                occupancy.take(*taken[-1])
+            else:
+                occupancy.release(*taken.pop(rng.randrange(len(taken))))
+            c, day = rng.choice(courses), rng.choice([DAY, "Monday"])
+            with self.subTest(step=step):
+                self.assertEqual(occupancy.blocked_mask(c, day), uncached_mask(occupancy, c, day))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NewAway"))
+
+import bench
+import optimize
+import scheduler
+import timegrid
+from occupancy import window_mask
+from resources import group_of
+
+
+class OptimizeTest(unittest.TestCase):
+    def test_keeps_hard_constraints_and_never_raises_cost(self):
+        grid = timegrid.DEFAULT
+        teachers, teacher_priorities, courses = bench.generate_instance(80, seed=3)
+        routine, _ = scheduler.solve(courses, teacher_priorities, teachers)
+        result, diagnostics = optimize.optimize(routine, courses, teacher_priorities, teachers,
+                                                time_limit=0.5, seed=1)
+
+        stats = diagnostics["optimizer"]
+        self.assertGreater(stats["accepted"], 0)
+        self.assertLessEqual(stats["final_cost"], stats["initial_cost"])
+
+        missing = {item["code"]: item["required"] - item["assigned"] for item in diagnostics["unplaced"]}
+        placements = scheduler.routine_placements(result, courses)
+        teacher_masks, group_masks = {}, {}
+        for course in courses:
+            code = course["code"]
+            placed = placements[code]
+            with self.subTest(code=code):
+                # Two lectures on one day would show up as one longer block
+                self.assertEqual(len(placed), scheduler.required_sessions(course) - missing.get(code, 0))
+                for day, slots, _ in placed:
+                    windows = grid.lab_windows if scheduler.is_even_course(code) else grid.lecture_windows
+                    self.assertIn(sorted(slots), [w for w, _ in windows[day]])
+                    mask = window_mask(slots)
+                    for masks, key in ((teacher_masks, (course["teacher"], day)),
+                                       (group_masks, (group_of(course), day))):
+                        self.assertFalse(masks.get(key, 0) & mask, key)
+                        masks[key] = masks.get(key, 0) | mask
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import itertools
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NewAway"))
+
+import bench
+import scheduler
+import search
+import timegrid
+
+# Small enough to enumerate every assignment
+GRID = timegrid.TimeGrid(days=["Sunday", "Monday"], slots=4, breaks=(), lab_length=2)
+
+
+def random_instance(rng):
+    courses = []
+    for i in range(rng.randint(3, 5)):
+        lab = rng.random() < 0.4
+        course = {"code": f"C {100 + 2 * i + (0 if lab else 1)}", "name": "", "year": 1,
+                  "credit": 1.5 if lab else float(rng.randint(1, 2)), "teacher": rng.choice("AB")}
+        if rng.random() < 0.3:
+            course["section"] = rng.choice("XY")
+        courses.append(course)
+    return courses
+
+
+def brute_force(solver):
+    """True if some choice of one value per session has no conflicting pair"""
+    sessions = solver.sessions
+    for values in itertools.product(*(s.values for s in sessions)):
+        if not any(solver._conflicts(a, va, b, vb)
+                   for (a, va), (b, vb) in itertools.combinations(zip(sessions, values), 2)):
+            return True
+    return False
+
+
+class SearchSolverTest(unittest.TestCase):
+    def test_agrees_with_brute_force(self):
+        rng = random.Random(0)
+        for case in range(150):
+            courses = random_instance(rng)
+            solver = search.SearchSolver(courses, {}, node_limit=0, time_limit=0, grid=GRID)
+            assignment, status = solver.run()
+            with self.subTest(case=case, courses=courses):
+                self.assertEqual(status, "complete" if brute_force(solver) else "infeasible")
+                if status == "complete":
+                    self.assertEqual(len(assignment), len(solver.sessions))
+                    for (a, va), (b, vb) in itertools.combinations(assignment.items(), 2):
+                        self.assertFalse(solver._conflicts(a, va, b, vb))
+
+    def test_default_week_instance_is_complete(self):
+        courses = [{"code": f"CSE {1100 + i}", "name": "", "year": 1 + i % 2,
+                    "credit": 1.5 if i % 2 == 0 else 3.0, "teacher": f"T{i % 3}"} for i in range(8)]
+        _, status = search.SearchSolver(courses, {}).run()
+        self.assertEqual(status, "complete")
+
+    def test_large_backtrack_free_instance_finishes_within_budget(self):
+        _, teacher_priorities, courses = bench.generate_instance(1500)
+        solver = search.SearchSolver(courses, teacher_priorities, time_limit=10.0)
+        _, status = solver.run()
+        self.assertEqual(status, "complete")
+        self.assertEqual(solver.backjumps, 0)
+        # Every session is assigned, so no session has an unassigned neighbour left
+        self.assertFalse(any(solver.degree.values()))
+
+
+    def test_session_without_windows_does_not_sink_the_search(self):
+        teachers, teacher_priorities, courses = bench.generate_instance(28, n_teachers=5, n_years=2)
+        courses.append({"code": "CSE 99991", "name": "", "year": 1, "credit": 3.0, "teacher": "Busy"})
+        busy = {("Busy", day): (1 << len(timegrid.DEFAULT.slots)) - 1 for day in timegrid.DEFAULT.days}
+        _, diagnostics = search.solve(courses, teacher_priorities, teachers, busy=busy)
+
+        self.assertEqual(diagnostics["search"]["status"], "complete")
+        self.assertNotIn("fallback", diagnostics["search"])
+        self.assertEqual(diagnostics["unplaced"], [{"code": "CSE 99991", "assigned": 0, "required": 3}])
+        self.assertIn("CSE 99991: no free window for session 1", diagnostics["warnings"])
+
+
+if __name__ == "__main__":
+    unittest.main()
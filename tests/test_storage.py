@@ -0,0 +1,167 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NewAway"))
+
+import scheduler
+import storage
+
+
+def course(code):
+    return {"code": code, "name": f"Course {code}", "teacher": "T", "year": 1, "credit": 3.0}
+
+
+class CourseStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "courses.txt")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_append_after_crash_mid_line(self):
+        store = storage.CourseStore(self.path)
+        store.append(course("A"))
+        # A crash while appending leaves half a line behind
+        with open(self.path, "a") as file:
+            file.write('{"code": "H"')
+
+        store = storage.CourseStore(self.path)
+        self.assertEqual([c["code"] for c in store.load()], ["A"])
+        store.append(course("N"))
+
+        self.assertEqual(sorted(c["code"] for c in storage.read_courses(self.path)), ["A", "N"])
+        self.assertEqual(sorted(c["code"] for c in storage.CourseStore(self.path).load()), ["A", "N"])
+
+    def test_append_keeps_record_missing_its_newline(self):
+        with open(self.path, "w") as file:
+            file.write(json.dumps(course("A")))
+        store = storage.CourseStore(self.path)
+        store.append(course("B"))
+
+        self.assertEqual(sorted(c["code"] for c in store.load()), ["A", "B"])
+        self.assertEqual(sorted(c["code"] for c in storage.read_courses(self.path)), ["A", "B"])
+        with open(self.path) as file:
+            self.assertEqual(file.read(), f"{json.dumps(course('A'))}\n{json.dumps(course('B'))}\n")
+
+    def test_append_keeps_records_another_store_appended(self):
+        store = storage.CourseStore(self.path)
+        store.append(course("A"))
+        storage.CourseStore(self.path).append(course("B"))
+        store.append(course("C"))
+
+        self.assertEqual([c["code"] for c in storage.read_courses(self.path)], ["A", "B", "C"])
+
+    def test_append_waits_for_an_append_in_progress(self):
+        store = storage.CourseStore(self.path)
+        store.append(course("A"))
+        other = storage.CourseStore(self.path)
+        first, rest = json.dumps(course("B")).split(", ", 1)
+
+        with storage.locked_append(self.path) as file:
+            # Another operator is halfway through writing a record
+            file.write(first + ", ")
+            file.flush()
+            writer = threading.Thread(target=store.append, args=(course("C"),))
+            writer.start()
+            writer.join(0.2)
+            self.assertTrue(writer.is_alive())
+            file.write(rest + "\n")
+        writer.join()
+
+        self.assertEqual([c["code"] for c in storage.read_courses(self.path)], ["A", "B", "C"])
+        self.assertEqual([c["code"] for c in other.load()], ["A", "B", "C"])
+
+    def test_load_keeps_complete_record_missing_its_newline(self):
+        with open(self.path, "w") as file:
+            file.write(json.dumps(course("A")) + "\n" + json.dumps(course("B")))
+        store = storage.CourseStore(self.path)
+
+        self.assertEqual([c["code"] for c in store.load()], ["A", "B"])
+        self.assertEqual([c["code"] for c in storage.read_courses(self.path)], ["A", "B"])
+        store.append(course("C"))
+        self.assertEqual([c["code"] for c in storage.CourseStore(self.path).load()], ["A", "B", "C"])
+
+    def test_concurrent_appends_survive_compaction(self):
+        removed = [course(f"R{i}") for i in range(100)]
+        storage.CourseStore(self.path).extend(removed)
+        appended = [course(f"A{i}") for i in range(400)]
+
+        def append_all():
+            store = storage.CourseStore(self.path)
+            for c in appended:
+                store.append(c)
+
+        writer = threading.Thread(target=append_all)
+        writer.start()
+        # Every removal compacts, rewriting the file under the writer
+        remover = storage.CourseStore(self.path, compact_min=1)
+        for c in removed:
+            remover.remove(c["code"])
+        writer.join()
+
+        self.assertEqual(sorted(c["code"] for c in storage.read_courses(self.path)),
+                         sorted(c["code"] for c in appended))
+
+    def test_read_courses_ignores_half_written_last_line(self):
+        with open(self.path, "w") as file:
+            file.write(json.dumps(course("A")) + '\n{"code": ')
+        self.assertEqual([c["code"] for c in storage.read_courses(self.path)], ["A"])
+
+
+class AppendLinesTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "teachers.txt")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_ends_last_line_missing_its_newline(self):
+        with open(self.path, "w") as file:
+            file.write("A\nB")
+        scheduler.append_teacher(self.path, "C", "CSE")
+        self.assertEqual(scheduler.load_teachers(self.path), ["A", "B", "C"])
+
+    def test_appends_to_new_and_terminated_files(self):
+        storage.append_lines(self.path, ["A\n"])
+        storage.append_lines(self.path, ["B\n"])
+        with open(self.path) as file:
+            self.assertEqual(file.read(), "A\nB\n")
+
+
+class AtomicWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "teachers.txt")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_keeps_file_mode(self):
+        with open(self.path, "w") as file:
+            file.write("old\n")
+        os.chmod(self.path, 0o644)
+        storage.atomic_write(self.path, ["new\n"])
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+        with open(self.path) as file:
+            self.assertEqual(file.read(), "new\n")
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_new_file_follows_umask(self):
+        umask = os.umask(0o022)
+        try:
+            storage.atomic_write(self.path, ["new\n"])
+        finally:
+            os.umask(umask)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+
+
+if __name__ == "__main__":
+    unittest.main()
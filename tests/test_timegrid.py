@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NewAway"))
+
+import timegrid
+from occupancy import window_mask
+
+
+class ParseTimeRangeTest(unittest.TestCase):
+    def test_default_week(self):
+        grid = timegrid.DEFAULT
+        self.assertEqual(grid.parse_time_range("12pm-5pm"), [4, 5, 6, 7, 8])
+        self.assertEqual(grid.parse_time_range("9am-10am"), [1])
+        self.assertEqual(grid.parse_time_range(" 9am - 12pm "), [1, 2, 3])
+
+    def test_rejects_ranges_off_slot_boundaries(self):
+        grid = timegrid.DEFAULT
+        for text in ("12am-1pm", "9am-9:30am", "5pm-9am", "9am", "9am-10am-11am", "13pm-2pm"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    grid.parse_time_range(text)
+
+    def test_half_hour_grid(self):
+        grid = timegrid.TimeGrid(slot_minutes=30, slots=16, breaks=(9, 10))
+        self.assertEqual(grid.parse_time_range("9:30am-10:30am"), [2, 3])
+        self.assertEqual(grid.label(2), "9:30-10")
+
+    def test_preference_drops_closed_slots(self):
+        grid = timegrid.TimeGrid(day_overrides={"Thursday": {"slots": 4}})
+        self.assertEqual(grid.parse_preference("Thursday 12pm-5pm"), ("Thursday", window_mask([4])))
+        with self.assertRaises(ValueError):
+            grid.parse_preference("Friday 9am-10am")
+
+
+
+class GridValidationTest(unittest.TestCase):
+    def test_rejects_malformed_settings(self):
+        for data in ({"days": "Sunday"}, {"days": [1, 2]}, {"breaks": 5}, {"breaks": ["5"]},
+                     {"day_overrides": {"Thursday": 4}}, {"day_overrides": ["Thursday"]},
+                     {"day_overrides": {"Thursday": {"breaks": 5}}}, {"lab_length": "3"}):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    timegrid.TimeGrid.from_dict(data)
+
+    def test_accepts_overrides(self):
+        grid = timegrid.TimeGrid.from_dict({"days": ["Sunday", "Thursday"], "breaks": [5],
+                                            "day_overrides": {"Thursday": {"slots": 4, "breaks": []}}})
+        self.assertEqual(grid.days, ["Sunday", "Thursday"])
+        self.assertEqual(grid.open_masks["Thursday"], window_mask([1, 2, 3, 4]))
+
+
+if __name__ == "__main__":
+    unittest.main()